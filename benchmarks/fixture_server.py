@@ -0,0 +1,158 @@
+"""
+离线夹具站点，回放 QQ 音乐和小红书页面的 HTML、JS 和 JSON
+
+    python benchmarks/fixture_server.py --port 8765
+
+QQMusic.BASE_URL 和 RedNote.BASE_URL 指向该站点即可在没有网络的情况下运行抓取代码。
+"""
+
+import argparse
+import json
+import mimetypes
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlsplit
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+# 页面路径前缀 -> 夹具文件
+PAGES = {
+    "/n/ryqq/search": "qq_music/search.html",
+    "/n/ryqq/songDetail/": "qq_music/song_detail.html",
+    "/search_result": "rednote/search_result.html",
+}
+
+# musicu.fcg 的 module -> 夹具文件
+MUSICU_MODULES = {
+    "music.search.SearchCgiService": "qq_music/search.json",
+    "music.pf_song_detail_svr": "qq_music/song_detail_api.json",
+    "music.globalComment.CommentRead": "qq_music/comments.json",
+}
+
+# 其他接口路径 -> 夹具文件
+APIS = {
+    "/lyric/fcgi-bin/fcg_query_lyric_new.fcg": "qq_music/lyric.json",
+}
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    server: "FixtureServer"
+
+    def do_GET(self):
+        path = urlsplit(self.path).path
+        if path == "/":
+            return self.send_fixture("qq_music/home.html")
+        for prefix, fixture in PAGES.items():
+            if path.startswith(prefix):
+                return self.send_fixture(fixture)
+        if path in APIS:
+            return self.send_fixture(APIS[path])
+        if path.startswith("/fixtures/"):
+            return self.send_fixture(path.removeprefix("/fixtures/"))
+        self.send_error(404)
+
+    def do_POST(self):
+        path = urlsplit(self.path).path
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length)
+        if path == "/cgi-bin/musicu.fcg":
+            return self.send_musicu(body)
+        self.send_error(404)
+
+    def send_musicu(self, body: bytes) -> None:
+        try:
+            request = json.loads(body or b"{}")
+        except json.JSONDecodeError:
+            return self.send_error(400)
+        response = {"code": 0}
+        for key, req in request.items():
+            if not isinstance(req, dict) or "module" not in req:
+                continue
+            fixture = MUSICU_MODULES.get(req["module"])
+            if fixture is None:
+                response[key] = {"code": 404}
+                continue
+            data = json.loads((FIXTURES_DIR / fixture).read_text(encoding="utf-8"))
+            # 夹具文件保存的是 req_1 的响应，按请求的键名返回
+            response[key] = data.get("req_1", data)
+        self.send_bytes(
+            json.dumps(response, ensure_ascii=False).encode(),
+            "application/json; charset=utf-8",
+        )
+
+    def send_fixture(self, fixture: str) -> None:
+        file = (FIXTURES_DIR / fixture).resolve()
+        if not file.is_relative_to(FIXTURES_DIR.resolve()) or not file.is_file():
+            return self.send_error(404)
+        content_type, _ = mimetypes.guess_type(file.name)
+        if content_type and content_type.startswith("text/"):
+            content_type += "; charset=utf-8"
+        self.send_bytes(file.read_bytes(), content_type or "application/octet-stream")
+
+    def send_bytes(self, body: bytes, content_type: str) -> None:
+        if self.server.latency_ms:
+            time.sleep(self.server.latency_ms / 1000)
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FixtureServer(ThreadingHTTPServer):
+    """
+    夹具站点的 HTTP 服务
+
+    Args:
+        port (int): 监听端口，为 0 时随机分配
+        latency_ms (int): 每个响应额外增加的延迟，用于模拟网络往返
+    """
+
+    daemon_threads = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency_ms: int = 0):
+        super().__init__((host, port), FixtureHandler)
+        self.latency_ms = latency_ms
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FixtureServer":
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=(__doc__ or "").strip().partition("\n")[0]
+    )
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=int, default=0)
+    args = parser.parse_args()
+
+    server = FixtureServer(port=args.port, latency_ms=args.latency_ms)
+    print(f"Serving fixtures on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,18 @@
+// 离线夹具的公共脚本：模拟页面的异步渲染节奏
+window.fixture = {
+  delay(ms) {
+    return new Promise((resolve) => setTimeout(resolve, ms));
+  },
+  escape(text) {
+    return String(text)
+      .replace(/&/g, "&amp;")
+      .replace(/</g, "&lt;")
+      .replace(/>/g, "&gt;")
+      .replace(/"/g, "&quot;");
+  },
+  duration(seconds) {
+    const m = String(Math.floor(seconds / 60)).padStart(2, "0");
+    const s = String(seconds % 60).padStart(2, "0");
+    return `${m}:${s}`;
+  },
+};
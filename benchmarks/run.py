@@ -0,0 +1,284 @@
+"""
+离线基准测试：在夹具站点上测量各工具的冷启动、热调用延迟、吞吐量和峰值内存
+
+    uv run python benchmarks/run.py run --output benchmarks/results/HEAD.json
+    uv run python benchmarks/run.py compare old.json new.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+from fixture_server import FixtureServer
+from mcp_server_lib import BrowserManager, metrics, process_tree_rss
+from mcp_server_qq_music.api import QQMusicApi
+from mcp_server_qq_music.browser import QQMusic
+from mcp_server_rednote.browser import RedNote
+from playwright.async_api import async_playwright
+
+SONG_LINKS = [
+    song["mid"]
+    for song in json.loads(
+        (Path(__file__).parent / "fixtures/qq_music/search.json").read_text("utf-8")
+    )["req_1"]["data"]["body"]["song"]["list"]
+]
+
+# 工具名 -> (站点, 调用函数)，第 i 次调用使用不同的参数以避免合并
+SCENARIOS: dict[str, tuple[str, Callable[[Any, int], Awaitable[Any]]]] = {
+    "check_login": ("qq_music", lambda qq, i: qq.check_login()),
+    "search_songs": (
+        "qq_music",
+        lambda qq, i: qq.search_songs(keyword=f"海阔天空{i}"),
+    ),
+    "get_song": (
+        "qq_music",
+        lambda qq, i: qq.get_song(
+            link=f"/n/ryqq/songDetail/{SONG_LINKS[i % len(SONG_LINKS)]}?i={i}"
+        ),
+    ),
+    "get_songs": (
+        "qq_music",
+        lambda qq, i: qq.get_songs(
+            links=[f"/n/ryqq/songDetail/{link}?i={i}" for link in SONG_LINKS[:5]],
+            concurrency=4,
+        ),
+    ),
+    "search_notes": (
+        "rednote",
+        lambda rednote, i: rednote.search_notes(keyword=f"穿搭{i}", limit=20),
+    ),
+}
+
+
+class RssSampler:
+    """周期性统计当前进程及其全部子进程（包括 Chromium）的 RSS 之和"""
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self.__run, daemon=True)
+
+    def __enter__(self) -> "RssSampler":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *_) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def reset(self) -> None:
+        self.peak = 0
+
+    def __run(self) -> None:
+        while not self._stop.is_set():
+            self.peak = max(self.peak, process_tree_rss(os.getpid()) or 0)
+            self._stop.wait(self.interval)
+
+
+def summarize(samples: list[float]) -> dict[str, float]:
+    ordered = sorted(samples)
+    return {
+        "mean": statistics.fmean(ordered),
+        "p50": ordered[len(ordered) // 2],
+        "p95": ordered[min(len(ordered) - 1, round(len(ordered) * 0.95))],
+        "min": ordered[0],
+        "max": ordered[-1],
+    }
+
+
+async def bench_tool(
+    tool: str,
+    *,
+    playwright,
+    base_url: str,
+    sampler: RssSampler,
+    iterations: int,
+    requests: int,
+    concurrency: int,
+    block_resources: bool,
+    client_mode: str,
+) -> dict:
+    site, call = SCENARIOS[tool]
+    target_cls = QQMusic if site == "qq_music" else RedNote
+    target_cls.BASE_URL = base_url
+    QQMusicApi.API_URL = f"{base_url}/cgi-bin/musicu.fcg"
+    QQMusicApi.LYRIC_URL = f"{base_url}/lyric/fcgi-bin/fcg_query_lyric_new.fcg"
+    QQMusicApi.COOKIE_URL = base_url
+
+    sampler.reset()
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = BrowserManager(
+            playwright=playwright,
+            headless=True,
+            storage_state_path=os.path.join(tmp, "state.json"),
+            pool_max_size=concurrency,
+            route_policy=target_cls.ROUTE_POLICY if block_resources else None,
+        )
+        if site == "qq_music":
+            target = QQMusic(manager, client_mode=client_mode)
+        else:
+            target = RedNote(manager)
+        try:
+            # 冷启动：第一次调用包含浏览器启动
+            start = time.perf_counter()
+            await call(target, 0)
+            cold = time.perf_counter() - start
+
+            warm = []
+            for i in range(1, iterations + 1):
+                start = time.perf_counter()
+                await call(target, i)
+                warm.append(time.perf_counter() - start)
+
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def one(i: int) -> None:
+                async with semaphore:
+                    await call(target, i)
+
+            start = time.perf_counter()
+            await asyncio.gather(
+                *(one(i) for i in range(iterations + 1, iterations + 1 + requests))
+            )
+            elapsed = time.perf_counter() - start
+        finally:
+            await manager.close()
+
+    result = {
+        "cold_ms": cold * 1000,
+        "warm_ms": {k: v * 1000 for k, v in summarize(warm).items()},
+        "throughput_rps": requests / elapsed,
+        "peak_rss_mb": sampler.peak / 1024 / 1024,
+    }
+    print(
+        f"{tool:<14} cold {result['cold_ms']:8.1f}ms"
+        f"  warm p50 {result['warm_ms']['p50']:8.1f}ms"
+        f"  {result['throughput_rps']:6.2f} req/s"
+        f"  rss {result['peak_rss_mb']:7.1f}MB",
+        file=sys.stderr,
+    )
+    return result
+
+
+async def run(args: argparse.Namespace) -> dict:
+    tools = args.tools or list(SCENARIOS)
+    server = FixtureServer(latency_ms=args.latency_ms).start()
+    try:
+        with RssSampler() as sampler:
+            async with async_playwright() as p:
+                results = {}
+                for tool in tools:
+                    results[tool] = await bench_tool(
+                        tool,
+                        playwright=p,
+                        base_url=server.base_url,
+                        sampler=sampler,
+                        iterations=args.iterations,
+                        requests=args.requests,
+                        concurrency=args.concurrency,
+                        block_resources=not args.no_block,
+                        client_mode=args.client_mode,
+                    )
+    finally:
+        server.stop()
+
+    return {
+        "commit": git_commit(),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "config": {
+            "iterations": args.iterations,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "latency_ms": args.latency_ms,
+            "block_resources": not args.no_block,
+            "client_mode": args.client_mode,
+        },
+        "tools": results,
+        "metrics": metrics.snapshot(),
+    }
+
+
+def compare(old: dict, new: dict) -> None:
+    rows = [
+        ("cold_ms", lambda r: r["cold_ms"]),
+        ("warm_p50_ms", lambda r: r["warm_ms"]["p50"]),
+        ("warm_p95_ms", lambda r: r["warm_ms"]["p95"]),
+        ("throughput_rps", lambda r: r["throughput_rps"]),
+        ("peak_rss_mb", lambda r: r["peak_rss_mb"]),
+    ]
+    print(f"{old.get('commit')} -> {new.get('commit')}")
+    for tool in sorted(old["tools"].keys() & new["tools"].keys()):
+        for name, get in rows:
+            before, after = get(old["tools"][tool]), get(new["tools"][tool])
+            delta = (after - before) / before * 100 if before else float("nan")
+            print(f"{tool:<14} {name:<15} {before:10.2f} {after:10.2f} {delta:+7.1f}%")
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=(__doc__ or "").strip().partition("\n")[0]
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="运行基准测试")
+    run_parser.add_argument("tools", nargs="*", help=f"可选：{', '.join(SCENARIOS)}")
+    run_parser.add_argument("--iterations", type=int, default=10)
+    run_parser.add_argument("--requests", type=int, default=20)
+    run_parser.add_argument("--concurrency", type=int, default=4)
+    run_parser.add_argument("--latency-ms", type=int, default=0)
+    run_parser.add_argument("--no-block", action="store_true")
+    run_parser.add_argument(
+        "--client-mode", choices=["api", "browser", "auto"], default="browser"
+    )
+    run_parser.add_argument("--output", type=Path)
+
+    compare_parser = subparsers.add_parser("compare", help="比较两次运行结果")
+    compare_parser.add_argument("old", type=Path)
+    compare_parser.add_argument("new", type=Path)
+
+    args = parser.parse_args()
+    if args.command == "compare":
+        compare(json.loads(args.old.read_text()), json.loads(args.new.read_text()))
+        return
+
+    unknown = set(args.tools) - SCENARIOS.keys()
+    if unknown:
+        parser.error(f"unknown tools: {', '.join(sorted(unknown))}")
+    result = asyncio.run(run(args))
+    output = json.dumps(result, ensure_ascii=False, indent=2)
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,8 +4,8 @@ from contextlib import asynccontextmanager
 from dataclasses import dataclass
 
 from fastmcp import Context, FastMCP
-from mcp_server_lib import browser_manager
-from playwright.async_api import Browser, BrowserContext, async_playwright
+from mcp_server_lib import BrowserManager, browser_manager
+from playwright.async_api import async_playwright
 
 from .settings import settings
 
@@ -18,12 +18,10 @@ logger = logging.getLogger(__name__)
 
 
 class MyBrowser:
-    browser: Browser
-    context: BrowserContext
+    manager: BrowserManager
 
-    def __init__(self, browser: Browser, context: BrowserContext):
-        self.browser = browser
-        self.context = context
+    def __init__(self, manager: BrowserManager):
+        self.manager = manager
 
     async def login(self):
         logger.info("Logging in...")
@@ -39,8 +37,8 @@ async def app_lifespan(server: FastMCP) -> AsyncIterator[AppContext]:
     async with async_playwright() as p:
         async with browser_manager(
             playwright=p, storage_state_path=settings.storage_state_path
-        ) as (browser, context):
-            yield AppContext(b=MyBrowser(browser, context))
+        ) as manager:
+            yield AppContext(b=MyBrowser(manager))
 
 
 mcp = FastMCP(
@@ -1,3 +1,63 @@
-from .browser import browser_manager, wait_for_stable
+from .browser import (
+    BrowserManager,
+    NetworkMode,
+    browser_manager,
+    scroll_for_more,
+    wait_for_dom_stable,
+    wait_for_stable,
+)
+from .cache import CacheStats, ToolCache, cached
+from .extract import Attr, Count, Nested, Text, extract, extract_all
+from .login import LoginChecker, LoginProbe
+from .metrics import Metrics, metrics, serve_prometheus
+from .navigation import NavigationError, NavigationPolicy, navigate
+from .output import dump, select_fields
+from .pool import PagePool
+from .process import process_tree_rss
+from .progress import PartialResult, progress_reporter, report_progress
+from .routing import ALLOW_ALL, RoutePolicy, RouteStats
+from .scheduler import Priority, QueueTimeoutError, Scheduler, TokenBucket, scheduled
+from .singleflight import SingleFlight, coalesced
 
-__all__ = ["browser_manager", "wait_for_stable"]
+__all__ = [
+    "ALLOW_ALL",
+    "Attr",
+    "BrowserManager",
+    "CacheStats",
+    "Count",
+    "LoginChecker",
+    "LoginProbe",
+    "Metrics",
+    "NavigationError",
+    "NavigationPolicy",
+    "Nested",
+    "NetworkMode",
+    "PagePool",
+    "PartialResult",
+    "Priority",
+    "QueueTimeoutError",
+    "RoutePolicy",
+    "RouteStats",
+    "Scheduler",
+    "SingleFlight",
+    "Text",
+    "TokenBucket",
+    "ToolCache",
+    "browser_manager",
+    "cached",
+    "coalesced",
+    "dump",
+    "extract",
+    "extract_all",
+    "metrics",
+    "navigate",
+    "process_tree_rss",
+    "progress_reporter",
+    "report_progress",
+    "scheduled",
+    "scroll_for_more",
+    "select_fields",
+    "serve_prometheus",
+    "wait_for_dom_stable",
+    "wait_for_stable",
+]
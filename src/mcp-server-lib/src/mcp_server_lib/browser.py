@@ -1,41 +1,555 @@
+import asyncio
 import logging
 import os
+import time
 from collections.abc import AsyncIterator
 from contextlib import asynccontextmanager
+from typing import Literal
 
-from playwright.async_api import Browser, BrowserContext, Locator, Page, Playwright
+from playwright.async_api import (
+    Browser,
+    BrowserContext,
+    Locator,
+    Page,
+    Playwright,
+    Route,
+)
+
+from .daemon import connect
+from .metrics import metrics
+from .pool import PagePool, PoolClosedError
+from .process import process_tree_rss
+from .routing import RoutePolicy, RouteStats
 
 logger = logging.getLogger(__name__)
 logger.addHandler(logging.NullHandler())
 
+# live: 直接访问网络
+# record: 访问网络并把所有请求和响应录制到 HAR 文件
+# replay: 只从 HAR 文件回放，HAR 中没有的请求直接中止
+NetworkMode = Literal["live", "record", "replay"]
 
-@asynccontextmanager
-async def browser_manager(
-    *,
-    playwright: Playwright,
-    headless: bool = False,
-    storage_state_path: str,
-) -> AsyncIterator[tuple[Browser, BrowserContext]]:
-    async def new_context(browser: Browser, storage_state_path: str) -> BrowserContext:
-        storage_state = os.path.expanduser(storage_state_path)
+# 回放时把上下文的代理指向一个不可用的地址，确保不经过路由的请求
+# （Service Worker、context.request）也无法访问网络
+_REPLAY_PROXY = {"server": "http://127.0.0.1:9"}
+
+
+class BrowserManager:
+    """
+    管理浏览器、浏览器上下文以及页面池
+
+    Args:
+        playwright (Playwright): Playwright 实例
+        headless (bool): 是否以无头模式启动浏览器
+        storage_state_path (str): 登录状态的保存路径
+        pool_max_size (int): 页面池的页面数量上限
+        pool_min_idle (int): 页面池预热的页面数
+        pool_max_idle_seconds (float): 空闲页面的最长保留时间，单位为秒
+        pool_max_uses (int): 单个页面的最大复用次数
+        route_policy (RoutePolicy | None): 默认的请求拦截策略，为 None 时不拦截请求
+        recycle_after_pages (int | None): 上下文创建的页面数达到该值后重建上下文，None 表示不限制
+        recycle_rss_mb (float | None): 进程树（包括 Chromium）的 RSS 超过该值后重建上下文，
+            单位为 MB，None 表示不限制
+        health_check_interval (float): 健康检查的间隔，单位为秒
+        health_check_timeout (float): 健康检查的超时时间，超时视为浏览器无响应，单位为秒
+        restart_backoff (float): 重启浏览器的初始退避时间，每次连续失败翻倍，单位为秒
+        restart_backoff_max (float): 重启浏览器的最长退避时间，单位为秒
+        drain_timeout (float): 重建时等待旧页面归还的最长时间，单位为秒
+        network_mode (NetworkMode): 网络模式，record 和 replay 需要设置 har_path
+        har_path (str | None): 录制或回放使用的 HAR 文件路径
+        cdp_endpoint (str | None): 共享浏览器的远程调试地址，设置后通过 CDP 连接而不是
+            启动新的浏览器，见 mcp_server_lib.daemon
+        cdp_autostart (bool): 连接共享浏览器失败时是否自动启动 daemon
+
+    浏览器在第一次调用 start、page 或 get_context 时启动，并发的调用者会等待同一次启动，
+    启动失败后下一次调用会重新尝试。warm_up 可以在后台提前启动浏览器。
+
+    启动后会监控浏览器：浏览器断开连接或健康检查超时时按退避时间重启浏览器，页面崩溃、
+    创建的页面数或内存超过阈值时重建上下文。重建前保存登录状态并在新的上下文中加载，
+    新的调用立即使用新的上下文，正在进行的调用在旧的上下文中完成后再关闭旧的上下文。
+
+    录制模式下 HAR 在上下文关闭时写入，重建上下文会覆盖之前的录制，因此不会按页面数和
+    内存重建上下文。回放模式不会保存登录状态。
+
+    连接共享浏览器时只创建和关闭自己的上下文，关闭时断开连接而不会关闭浏览器，
+    recycle_rss_mb 只统计当前进程树，不包括共享的浏览器。
+    """
+
+    browser: Browser
+    context: BrowserContext
+    pool: PagePool
+
+    def __init__(
+        self,
+        *,
+        playwright: Playwright,
+        headless: bool = False,
+        storage_state_path: str,
+        pool_max_size: int = 4,
+        pool_min_idle: int = 1,
+        pool_max_idle_seconds: float = 300,
+        pool_max_uses: int = 50,
+        route_policy: RoutePolicy | None = None,
+        recycle_after_pages: int | None = 500,
+        recycle_rss_mb: float | None = None,
+        health_check_interval: float = 30,
+        health_check_timeout: float = 10,
+        restart_backoff: float = 1,
+        restart_backoff_max: float = 60,
+        drain_timeout: float = 60,
+        network_mode: NetworkMode = "live",
+        har_path: str | None = None,
+        cdp_endpoint: str | None = None,
+        cdp_autostart: bool = False,
+    ):
+        if network_mode != "live" and har_path is None:
+            raise ValueError(f"har_path is required in {network_mode} mode")
+        if network_mode == "record" and (recycle_after_pages or recycle_rss_mb):
+            logger.info("Context recycling is disabled in record mode")
+            recycle_after_pages = None
+            recycle_rss_mb = None
+        self.playwright = playwright
+        self.headless = headless
+        self.storage_state_path = storage_state_path
+        self.pool_max_size = pool_max_size
+        self.pool_min_idle = pool_min_idle
+        self.pool_max_idle_seconds = pool_max_idle_seconds
+        self.pool_max_uses = pool_max_uses
+        self.route_policy = route_policy
+        self.recycle_after_pages = recycle_after_pages
+        self.recycle_rss_mb = recycle_rss_mb
+        self.health_check_interval = health_check_interval
+        self.health_check_timeout = health_check_timeout
+        self.restart_backoff = restart_backoff
+        self.restart_backoff_max = restart_backoff_max
+        self.drain_timeout = drain_timeout
+        self.network_mode = network_mode
+        self.har_path = har_path
+        self.cdp_endpoint = cdp_endpoint
+        self.cdp_autostart = cdp_autostart
+        self.route_stats = RouteStats()
+        self.restarts = 0
+        self.recycles = 0
+        self._page_route_policies: dict[Page, RoutePolicy] = {}
+        self._startup: asyncio.Task | None = None
+        self._startup_requested_at = 0.0
+        self._launched = False
+        self._closing = False
+        # 连续失败的启动次数，用于计算退避时间，健康检查通过后清零
+        self._failures = 0
+        self._context_pages = 0
+        self._watchdog: asyncio.Task | None = None
+        self._retiring: set[asyncio.Task] = set()
+
+    @property
+    def started(self) -> bool:
+        return (
+            self._startup is not None
+            and self._startup.done()
+            and not self._startup.cancelled()
+            and self._startup.exception() is None
+        )
+
+    async def start(self) -> None:
+        """启动浏览器，已经启动时直接返回"""
+        startup = self.__startup()
+        try:
+            await asyncio.shield(startup)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            if self._startup is startup:
+                self._startup = None
+            raise
+
+    def warm_up(self) -> None:
+        """在后台启动浏览器，失败时只记录日志，下一次使用时会重新尝试"""
+        self.__startup().add_done_callback(self.__on_warm_up_done)
+
+    async def get_context(self) -> BrowserContext:
+        """获取浏览器上下文，必要时启动浏览器"""
+        await self.start()
+        return self.context
+
+    async def close(self) -> None:
+        self._closing = True
+        if self._watchdog:
+            self._watchdog.cancel()
+            self._watchdog = None
+        startup = self._startup
+        if startup is not None and not startup.done():
+            startup.cancel()
+        if startup is not None:
+            try:
+                await startup
+            except (Exception, asyncio.CancelledError):
+                logger.debug("Browser startup aborted by close", exc_info=True)
+        for task in self._retiring:
+            task.cancel()
+        await asyncio.gather(*self._retiring, return_exceptions=True)
+        if not self._launched:
+            # 浏览器没有启动成功，无需清理
+            return
+        if self.route_policy is not None:
+            logger.info(f"Route stats: {self.route_stats.as_dict()}")
+        await self.pool.close()
+        if not self.browser.is_connected():
+            return
+        await self.__save_storage_state(self.context)
+        await self.context.close()
+        await self.browser.close()
+
+    def samples(self) -> list[tuple[str, dict[str, str], float]]:
+        return [
+            ("browser_restarts_total", {}, self.restarts),
+            ("browser_context_recycles_total", {}, self.recycles),
+        ]
+
+    @asynccontextmanager
+    async def page(
+        self, route_policy: RoutePolicy | None = None
+    ) -> AsyncIterator[Page]:
+        """
+        从页面池中获取页面，退出时归还
+
+        Args:
+            route_policy (RoutePolicy | None): 仅对该页面生效的请求拦截策略，
+                覆盖默认策略，未设置默认策略时不生效
+        """
+        pool, page = await self.__acquire()
+        if route_policy is not None:
+            self._page_route_policies[page] = route_policy
+        try:
+            yield page
+        except BaseException:
+            # 出现异常的页面不再复用
+            await pool.release(page, discard=True)
+            raise
+        else:
+            await pool.release(page)
+        finally:
+            self._page_route_policies.pop(page, None)
+
+    async def __acquire(self) -> tuple[PagePool, Page]:
+        while True:
+            await self.start()
+            pool = self.pool
+            try:
+                return pool, await pool.acquire()
+            except PoolClosedError:
+                # 等待页面时上下文被重建，改为从新的页面池获取
+                continue
+
+    def __startup(self) -> asyncio.Task:
+        startup = self._startup
+        if startup is not None and startup.done() and not startup.cancelled():
+            if startup.exception() is not None:
+                # 上一次启动或重启失败，重新尝试
+                self._startup = None
+        if self._startup is None:
+            self._startup_requested_at = time.monotonic()
+            self._startup = asyncio.create_task(self.__launch())
+        return self._startup
+
+    def __on_warm_up_done(self, startup: asyncio.Task) -> None:
+        if startup.cancelled() or startup.exception() is None:
+            return
+        logger.error("Failed to warm up browser", exc_info=startup.exception())
+        if self._startup is startup:
+            self._startup = None
+
+    async def __launch(self) -> None:
+        if self._failures:
+            delay = min(
+                self.restart_backoff * 2 ** (self._failures - 1),
+                self.restart_backoff_max,
+            )
+            logger.info("Launching browser in %.1fs", delay)
+            await asyncio.sleep(delay)
+        try:
+            if self.cdp_endpoint is not None:
+                browser = await connect(
+                    self.playwright,
+                    self.cdp_endpoint,
+                    autostart=self.cdp_autostart,
+                    headless=self.headless,
+                )
+            else:
+                browser = await self.playwright.chromium.launch(headless=self.headless)
+        except Exception:
+            self._failures += 1
+            raise
+        try:
+            await self.__open_context(browser)
+        except BaseException:
+            self._failures += 1
+            await browser.close()
+            raise
+        browser.on("disconnected", self.__on_disconnected)
+        if self._watchdog is None:
+            self._watchdog = asyncio.create_task(self.__watch())
+        logger.info(
+            "Browser ready in %.2fs", time.monotonic() - self._startup_requested_at
+        )
+
+    async def __open_context(self, browser: Browser) -> None:
+        """创建上下文和页面池并替换当前的上下文，旧的上下文在后台回收"""
+        context = await self.__new_context(browser)
+        try:
+            if self.network_mode != "live":
+                # __init__ 已经校验过非 live 模式必须设置 har_path
+                assert self.har_path is not None
+                # 路由按注册的逆序匹配，拦截策略放行（fallback）的请求再交给 HAR
+                await context.route_from_har(
+                    os.path.expanduser(self.har_path),
+                    not_found="abort",
+                    update=self.network_mode == "record",
+                    update_content="embed",
+                )
+            if self.route_policy is not None:
+                # 注意：启用路由后 Playwright 会禁用 HTTP 缓存
+                await context.route("**/*", self.__handle_route)
+            context.on("page", self.__on_page)
+            pool = PagePool(
+                context,
+                max_size=self.pool_max_size,
+                min_idle=self.pool_min_idle,
+                max_idle_seconds=self.pool_max_idle_seconds,
+                max_uses=self.pool_max_uses,
+            )
+            await pool.start()
+        except BaseException:
+            await context.close()
+            raise
+        if self._launched:
+            self.__retire(
+                self.pool,
+                self.context,
+                self.browser if self.browser is not browser else None,
+            )
+        self.browser = browser
+        self.context = context
+        self.pool = pool
+        self._launched = True
+        self._context_pages = 0
+
+    async def __recycle(self, relaunch: bool) -> None:
+        if relaunch:
+            # 旧的浏览器可能已经无响应，使用最近一次健康检查保存的登录状态
+            self.restarts += 1
+            await self.__launch()
+            return
+        # 保存登录状态，新的上下文会重新加载
+        try:
+            await asyncio.wait_for(
+                self.__save_storage_state(self.context), self.health_check_timeout
+            )
+        except TimeoutError:
+            logger.warning("Timed out saving storage state before recycling")
+        try:
+            await self.__open_context(self.browser)
+        except Exception:
+            logger.exception("Failed to recycle context, restarting browser")
+            self.restarts += 1
+            await self.__launch()
+            return
+        self.recycles += 1
+        logger.info("Browser context recycled")
+
+    def __schedule_recycle(self, reason: str, *, relaunch: bool) -> None:
+        # 启动或重建尚未完成时不再重复调度
+        if self._closing or not self.started:
+            return
+        what = "browser" if relaunch else "browser context"
+        logger.warning(f"Recycling {what}: {reason}")
+        self._startup_requested_at = time.monotonic()
+        self._startup = asyncio.create_task(self.__recycle(relaunch))
+
+    def __retire(
+        self, pool: PagePool, context: BrowserContext, browser: Browser | None
+    ) -> None:
+        task = asyncio.create_task(self.__drain(pool, context, browser))
+        self._retiring.add(task)
+        task.add_done_callback(self._retiring.discard)
+
+    async def __drain(
+        self, pool: PagePool, context: BrowserContext, browser: Browser | None
+    ) -> None:
+        try:
+            if not await pool.drain(self.drain_timeout):
+                logger.warning(
+                    "Closing retired context with %d pages still in use", pool.in_use
+                )
+        finally:
+            try:
+                if browser is not None:
+                    await browser.close()
+                else:
+                    await context.close()
+            except Exception:
+                logger.debug("Failed to close retired browser", exc_info=True)
+
+    def __on_disconnected(self, browser: Browser) -> None:
+        if browser is not self.browser:
+            return
+        self._failures += 1
+        self.__schedule_recycle("browser disconnected", relaunch=True)
+
+    def __on_page(self, page: Page) -> None:
+        page.on("crash", self.__on_crash)
+        if not self._launched or page.context is not self.context:
+            # 新上下文替换前预热的页面
+            return
+        self._context_pages += 1
+        if self.recycle_after_pages and self._context_pages >= self.recycle_after_pages:
+            self.__schedule_recycle(
+                f"{self._context_pages} pages created", relaunch=False
+            )
+
+    def __on_crash(self, page: Page) -> None:
+        logger.warning(f"Page crashed: {page.url}")
+        if page.context is not self.context:
+            return
+        self.__schedule_recycle("page crashed", relaunch=False)
+
+    async def __watch(self) -> None:
+        while True:
+            await asyncio.sleep(self.health_check_interval)
+            if self.started:
+                await self.__check_health()
+
+    async def __check_health(self) -> None:
+        if not self.browser.is_connected():
+            self.__schedule_recycle("browser disconnected", relaunch=True)
+            return
+        # 保存登录状态需要浏览器响应，同时作为存活探测
+        try:
+            await asyncio.wait_for(
+                self.__save_storage_state(self.context), self.health_check_timeout
+            )
+        except TimeoutError:
+            self.__schedule_recycle("browser is unresponsive", relaunch=True)
+            return
+        self._failures = 0
+
+        if self.recycle_rss_mb is None:
+            return
+        rss = await asyncio.to_thread(process_tree_rss, os.getpid())
+        if rss is not None and rss > self.recycle_rss_mb * 1024 * 1024:
+            self.__schedule_recycle(
+                f"RSS {rss / 1024 / 1024:.0f}MB exceeds {self.recycle_rss_mb}MB",
+                relaunch=False,
+            )
+
+    async def __handle_route(self, route: Route) -> None:
+        request = route.request
+        policy = self.route_policy
+        try:
+            policy = self._page_route_policies.get(request.frame.page, policy)
+        except Exception:
+            # Service Worker 发出的请求没有对应的 frame
+            logger.debug(f"No page for request {request.url}", exc_info=True)
+        if policy is None:
+            await route.fallback()
+            return
+        action = policy.decide(request.url, request.resource_type)
+        self.route_stats.record(action, request.resource_type)
+        if action == "abort":
+            await route.abort("blockedbyclient")
+        elif action == "stub":
+            await route.fulfill(status=200, body="")
+        else:
+            await route.fallback()
+
+    async def __save_storage_state(self, context: BrowserContext) -> None:
+        if self.network_mode == "replay":
+            return
+        try:
+            await context.storage_state(
+                path=os.path.expanduser(self.storage_state_path)
+            )
+        except Exception:
+            logger.warning("Failed to save storage state", exc_info=True)
+
+    async def __new_context(self, browser: Browser) -> BrowserContext:
+        options = {}
+        if self.network_mode != "live":
+            # Service Worker 发出的请求不经过路由，无法录制和回放
+            options["service_workers"] = "block"
+        if self.network_mode == "record":
+            assert self.har_path is not None
+            os.makedirs(
+                os.path.dirname(os.path.expanduser(self.har_path)), exist_ok=True
+            )
+        if self.network_mode == "replay":
+            options["proxy"] = _REPLAY_PROXY
+        storage_state = os.path.expanduser(self.storage_state_path)
         logger.info(f"Storage state path: {storage_state}")
         try:
             directory = os.path.dirname(storage_state)
             if not os.path.exists(directory):
                 os.makedirs(directory)
-            return await browser.new_context(storage_state=storage_state)
+            return await browser.new_context(storage_state=storage_state, **options)
         except Exception as e:
             logger.info(f"Failed to load context, creating a new one: {e}")
-            return await browser.new_context()
+            return await browser.new_context(**options)
+
 
-    browser = await playwright.chromium.launch(headless=headless)
-    context = await new_context(browser, storage_state_path)
+@asynccontextmanager
+async def browser_manager(
+    *,
+    playwright: Playwright,
+    headless: bool = False,
+    storage_state_path: str,
+    pool_max_size: int = 4,
+    pool_min_idle: int = 1,
+    pool_max_idle_seconds: float = 300,
+    pool_max_uses: int = 50,
+    route_policy: RoutePolicy | None = None,
+    recycle_after_pages: int | None = 500,
+    recycle_rss_mb: float | None = None,
+    health_check_interval: float = 30,
+    network_mode: NetworkMode = "live",
+    har_path: str | None = None,
+    cdp_endpoint: str | None = None,
+    cdp_autostart: bool = False,
+    lazy: bool = False,
+    warm_up: bool = True,
+) -> AsyncIterator[BrowserManager]:
+    """
+    创建 BrowserManager 并在退出时关闭
+
+    Args:
+        lazy (bool): 是否延迟启动浏览器，为 True 时不等待浏览器启动即返回
+        warm_up (bool): 延迟启动时是否立即在后台启动浏览器
+
+    其余参数见 BrowserManager。
+    """
+    manager = BrowserManager(
+        playwright=playwright,
+        headless=headless,
+        storage_state_path=storage_state_path,
+        pool_max_size=pool_max_size,
+        pool_min_idle=pool_min_idle,
+        pool_max_idle_seconds=pool_max_idle_seconds,
+        pool_max_uses=pool_max_uses,
+        route_policy=route_policy,
+        recycle_after_pages=recycle_after_pages,
+        recycle_rss_mb=recycle_rss_mb,
+        health_check_interval=health_check_interval,
+        network_mode=network_mode,
+        har_path=har_path,
+        cdp_endpoint=cdp_endpoint,
+        cdp_autostart=cdp_autostart,
+    )
+    if not lazy:
+        await manager.start()
+    elif warm_up:
+        manager.warm_up()
     try:
-        yield browser, context
+        yield manager
     finally:
-        await context.storage_state(path=storage_state_path)
-        await context.close()
-        await browser.close()
+        await manager.close()
 
 
 async def wait_for_stable(
@@ -72,3 +586,135 @@ async def wait_for_stable(
         previous_content = current_content
         await page.wait_for_timeout(check_interval_ms)
     return False
+
+
+_WAIT_FOR_DOM_STABLE_JS = """
+(element, [quietMs, timeoutMs]) => new Promise((resolve) => {
+    let quietTimer;
+    let deadlineTimer;
+    const observer = new MutationObserver(() => {
+        clearTimeout(quietTimer);
+        quietTimer = setTimeout(() => done(true), quietMs);
+    });
+    const done = (stable) => {
+        observer.disconnect();
+        clearTimeout(quietTimer);
+        clearTimeout(deadlineTimer);
+        resolve(stable);
+    };
+    observer.observe(element, {
+        childList: true,
+        subtree: true,
+        attributes: true,
+        characterData: true,
+    });
+    quietTimer = setTimeout(() => done(true), quietMs);
+    deadlineTimer = setTimeout(() => done(false), timeoutMs);
+})
+"""
+
+
+async def wait_for_dom_stable(
+    locator: Locator,
+    quiet_ms: int = 150,
+    timeout_ms: int = 10000,
+) -> bool:
+    """
+    在页面内通过 MutationObserver 等待 locator 对应的元素稳定
+
+    元素及其子树在 quiet_ms 内没有发生变化即视为稳定，整个过程只需要一次往返。
+    需要兼容不支持 MutationObserver 的场景时可以使用 wait_for_stable 轮询。
+
+    Args:
+        locator (Locator): 要检查的元素的 Locator 对象
+        quiet_ms (int): 没有变化的持续时间，单位为毫秒
+        timeout_ms (int): 最长等待时间，单位为毫秒
+
+    Returns:
+        bool: 在超时前稳定返回 True，否则返回 False
+    """
+    async with metrics.step("wait_for_dom_stable"):
+        stable = await locator.evaluate(_WAIT_FOR_DOM_STABLE_JS, [quiet_ms, timeout_ms])
+    logger.debug("[wait_for_dom_stable] Stable: %s", stable)
+    return stable
+
+
+_SCROLL_FOR_MORE_JS = """
+(container, [itemSelector, indexAttr, after, quietMs, timeoutMs]) => new Promise((resolve) => {
+    let grown = false;
+    let quietTimer;
+    let deadlineTimer;
+    const hasNewItem = () => {
+        const items = container.querySelectorAll(itemSelector);
+        for (let i = items.length - 1; i >= 0; i--) {
+            if (Number(items[i].getAttribute(indexAttr)) > after) return true;
+        }
+        return false;
+    };
+    const settle = () => {
+        clearTimeout(quietTimer);
+        quietTimer = setTimeout(() => done(true), quietMs);
+    };
+    const observer = new MutationObserver(() => {
+        if (grown) {
+            settle();
+        } else if (hasNewItem()) {
+            grown = true;
+            settle();
+        }
+    });
+    const done = (result) => {
+        observer.disconnect();
+        clearTimeout(quietTimer);
+        clearTimeout(deadlineTimer);
+        resolve(result);
+    };
+    observer.observe(container, {
+        childList: true,
+        subtree: true,
+        attributes: true,
+        characterData: true,
+    });
+    deadlineTimer = setTimeout(() => done(grown), timeoutMs);
+    if (hasNewItem()) {
+        grown = true;
+        settle();
+        return;
+    }
+    const items = container.querySelectorAll(itemSelector);
+    if (items.length) items[items.length - 1].scrollIntoView({ block: "end" });
+})
+"""
+
+
+async def scroll_for_more(
+    container: Locator,
+    item_selector: str,
+    index_attr: str,
+    after: float,
+    quiet_ms: float = 150,
+    timeout_ms: float = 10000,
+) -> bool:
+    """
+    无限滚动列表加载更多：把最后一个条目滚动到可见区域，等待出现新的条目并且内容稳定
+
+    不按固定像素滚动，也不需要轮询，整个过程只需要一次往返。
+
+    Args:
+        container (Locator): 列表容器
+        item_selector (str): 相对容器的条目选择器，如 `:scope > section`
+        index_attr (str): 条目序号所在的属性，序号随加载递增
+        after (float): 已经处理过的最大序号，出现更大的序号即视为加载了新条目
+        quiet_ms (float): 出现新条目后没有变化的持续时间，单位为毫秒
+        timeout_ms (float): 最长等待时间，单位为毫秒
+
+    Returns:
+        bool: 是否加载了新条目，没有更多条目时返回 False
+    """
+    async with metrics.step("scroll_for_more"):
+        grown = await container.evaluate(
+            _SCROLL_FOR_MORE_JS,
+            [item_selector, index_attr, after, quiet_ms, timeout_ms],
+        )
+    logger.debug("[scroll_for_more] Grown: %s", grown)
+    return grown
@@ -0,0 +1,318 @@
+import asyncio
+import contextvars
+import functools
+import inspect
+import json
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import Counter, OrderedDict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import Any, get_type_hints
+
+from pydantic import TypeAdapter
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+
+@dataclass
+class _Entry:
+    value: Any
+    expires_at: float
+    stale_until: float
+
+
+@dataclass
+class CacheStats:
+    """缓存命中计数，按工具名统计"""
+
+    hits: Counter[str] = field(default_factory=Counter)
+    stale_hits: Counter[str] = field(default_factory=Counter)
+    misses: Counter[str] = field(default_factory=Counter)
+
+    def as_dict(self) -> dict:
+        tools = self.hits.keys() | self.stale_hits.keys() | self.misses.keys()
+        return {
+            tool: {
+                "hits": self.hits[tool],
+                "stale_hits": self.stale_hits[tool],
+                "misses": self.misses[tool],
+            }
+            for tool in sorted(tools)
+        }
+
+    def samples(self) -> list[tuple[str, dict[str, str], float]]:
+        return [
+            (f"cache_{kind}_total", {"tool": tool}, count)
+            for kind, counter in (
+                ("hits", self.hits),
+                ("stale_hits", self.stale_hits),
+                ("misses", self.misses),
+            )
+            for tool, count in sorted(counter.items())
+        ]
+
+
+class ToolCache:
+    """
+    工具调用结果缓存，内存 LRU 加可选的 SQLite 持久化
+
+    Args:
+        max_entries (int): 内存中最多缓存的条目数
+        sqlite_path (str | None): SQLite 文件路径，为 None 时只使用内存缓存
+    """
+
+    def __init__(self, *, max_entries: int = 256, sqlite_path: str | None = None):
+        self.max_entries = max_entries
+        self.sqlite_path = sqlite_path
+        self.stats = CacheStats()
+
+        self._memory: OrderedDict[tuple[str, str], _Entry] = OrderedDict()
+        self._refreshing: dict[tuple[str, str], asyncio.Task] = {}
+        self._db: sqlite3.Connection | None = None
+        self._db_lock = threading.Lock()
+
+    async def get_or_call(
+        self,
+        tool: str,
+        args: dict[str, Any],
+        fn: Callable[[], Awaitable[Any]],
+        *,
+        ttl: float | None,
+        stale_ttl: float = 0,
+        adapter: TypeAdapter | None = None,
+    ) -> Any:
+        """
+        读取缓存，未命中时调用 fn 并写入缓存
+
+        Args:
+            tool (str): 工具名
+            args (dict[str, Any]): 工具参数，用于生成缓存键
+            fn (Callable[[], Awaitable[Any]]): 未命中时调用的函数，抛出的异常不会被缓存
+            ttl (float | None): 缓存有效期，单位为秒，为 None 时永不过期
+            stale_ttl (float): 过期后仍可返回旧值的时间，期间会在后台刷新缓存
+            adapter (TypeAdapter | None): 用于 SQLite 序列化的 TypeAdapter，为 None 时不落盘
+        """
+        key = (tool, make_key(args))
+        now = time.time()
+        entry = await self.__get(key, adapter)
+        if entry is not None and now < entry.expires_at:
+            self.stats.hits[tool] += 1
+            return entry.value
+        if entry is not None and now < entry.stale_until:
+            self.stats.stale_hits[tool] += 1
+            if key not in self._refreshing:
+                # 后台刷新不属于当前请求，不能继承其上下文，否则会向已经返回的请求报告进度
+                self._refreshing[key] = asyncio.create_task(
+                    self.__refresh(key, fn, ttl, stale_ttl, adapter),
+                    context=contextvars.Context(),
+                )
+            return entry.value
+
+        self.stats.misses[tool] += 1
+        value = await fn()
+        await self.__set(key, value, ttl, stale_ttl, adapter)
+        return value
+
+    async def invalidate(self, tool: str, args: dict[str, Any] | None = None) -> None:
+        """删除缓存，args 为 None 时删除该工具的全部缓存"""
+        if args is None:
+            for key in [k for k in self._memory if k[0] == tool]:
+                del self._memory[key]
+            await self.__execute("DELETE FROM cache WHERE tool = ?", (tool,))
+        else:
+            key = (tool, make_key(args))
+            self._memory.pop(key, None)
+            await self.__execute("DELETE FROM cache WHERE tool = ? AND key = ?", key)
+
+    async def close(self) -> None:
+        for task in self._refreshing.values():
+            task.cancel()
+        if self._db is not None:
+            await asyncio.to_thread(self._db.close)
+            self._db = None
+
+    async def __refresh(
+        self,
+        key: tuple[str, str],
+        fn: Callable[[], Awaitable[Any]],
+        ttl: float | None,
+        stale_ttl: float,
+        adapter: TypeAdapter | None,
+    ) -> None:
+        try:
+            value = await fn()
+            await self.__set(key, value, ttl, stale_ttl, adapter)
+        except Exception:
+            logger.exception(f"Failed to refresh cache for {key[0]}")
+        finally:
+            self._refreshing.pop(key, None)
+
+    async def __get(
+        self, key: tuple[str, str], adapter: TypeAdapter | None
+    ) -> _Entry | None:
+        entry = self._memory.get(key)
+        if entry is not None:
+            self._memory.move_to_end(key)
+            return entry
+        if adapter is None or self.sqlite_path is None:
+            return None
+        rows = await self.__execute(
+            "SELECT value, expires_at, stale_until FROM cache"
+            " WHERE tool = ? AND key = ?",
+            key,
+        )
+        if not rows:
+            return None
+        value, expires_at, stale_until = rows[0]
+        try:
+            entry = _Entry(adapter.validate_json(value), expires_at, stale_until)
+        except Exception:
+            logger.info(f"Discarding unreadable cache entry for {key[0]}")
+            return None
+        self.__remember(key, entry)
+        return entry
+
+    async def __set(
+        self,
+        key: tuple[str, str],
+        value: Any,
+        ttl: float | None,
+        stale_ttl: float,
+        adapter: TypeAdapter | None,
+    ) -> None:
+        expires_at = math.inf if ttl is None else time.time() + ttl
+        entry = _Entry(value, expires_at, expires_at + stale_ttl)
+        self.__remember(key, entry)
+        if adapter is None or self.sqlite_path is None:
+            return
+        await self.__execute(
+            "INSERT OR REPLACE INTO cache"
+            " (tool, key, value, expires_at, stale_until) VALUES (?, ?, ?, ?, ?)",
+            (*key, adapter.dump_json(value).decode(), expires_at, entry.stale_until),
+        )
+
+    def __remember(self, key: tuple[str, str], entry: _Entry) -> None:
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    async def __execute(self, sql: str, params: tuple) -> list[tuple]:
+        path = self.sqlite_path
+        if path is None:
+            return []
+        try:
+            return await asyncio.to_thread(self.__execute_sync, path, sql, params)
+        except sqlite3.Error:
+            logger.exception("Cache database error")
+            return []
+
+    def __execute_sync(self, path: str, sql: str, params: tuple) -> list[tuple]:
+        with self._db_lock:
+            if self._db is None:
+                self._db = self.__connect(path)
+            with self._db:
+                return self._db.execute(sql, params).fetchall()
+
+    def __connect(self, path: str) -> sqlite3.Connection:
+        path = os.path.expanduser(path)
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        db = sqlite3.connect(path, check_same_thread=False)
+        with db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                " tool TEXT NOT NULL,"
+                " key TEXT NOT NULL,"
+                " value TEXT NOT NULL,"
+                " expires_at REAL NOT NULL,"
+                " stale_until REAL NOT NULL,"
+                " PRIMARY KEY (tool, key))"
+            )
+            db.execute("DELETE FROM cache WHERE stale_until < ?", (time.time(),))
+        return db
+
+
+def make_key(args: dict[str, Any]) -> str:
+    """将工具参数规范化为缓存键，字符串会去除首尾空白并做 Unicode 规范化"""
+
+    def normalize(value: Any) -> Any:
+        if isinstance(value, str):
+            return unicodedata.normalize("NFKC", value).strip()
+        if isinstance(value, dict):
+            return {k: normalize(v) for k, v in value.items()}
+        if isinstance(value, set | frozenset):
+            return sorted((normalize(v) for v in value), key=str)
+        if isinstance(value, list | tuple):
+            return [normalize(v) for v in value]
+        return value
+
+    return json.dumps(normalize(args), sort_keys=True, ensure_ascii=False, default=str)
+
+
+def bind_arguments(
+    signature: inspect.Signature,
+    args: tuple,
+    kwargs: dict[str, Any],
+    exclude: tuple[str, ...] = (),
+) -> dict[str, Any]:
+    """将方法的调用参数绑定为字典，跳过 self 和 exclude 中的参数"""
+    bound = signature.bind(*args, **kwargs)
+    bound.apply_defaults()
+    return {k: v for k, v in list(bound.arguments.items())[1:] if k not in exclude}
+
+
+def cached(
+    ttl: float | None,
+    *,
+    stale_ttl: float = 0,
+    name: str | None = None,
+    exclude: tuple[str, ...] = (),
+):
+    """
+    缓存异步方法的返回值
+
+    被装饰的方法所属的对象需要提供 cache 属性（ToolCache | None），为 None 时不缓存。
+    返回值按返回类型注解序列化后写入 SQLite。
+
+    Args:
+        ttl (float | None): 缓存有效期，单位为秒，为 None 时永不过期
+        stale_ttl (float): 过期后仍可返回旧值并在后台刷新的时间，单位为秒
+        name (str | None): 工具名，默认为方法名
+        exclude (tuple[str, ...]): 不参与缓存键计算的参数名
+    """
+
+    def decorator(fn: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+        tool = name or fn.__name__
+        signature = inspect.signature(fn)
+
+        @functools.cache
+        def adapter() -> TypeAdapter:
+            return TypeAdapter(get_type_hints(fn)["return"])
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            self = args[0]
+            cache: ToolCache | None = getattr(self, "cache", None)
+            if cache is None:
+                return await fn(*args, **kwargs)
+            return await cache.get_or_call(
+                tool,
+                bind_arguments(signature, args, kwargs, exclude),
+                lambda: fn(*args, **kwargs),
+                ttl=ttl,
+                stale_ttl=stale_ttl,
+                adapter=adapter(),
+            )
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,153 @@
+"""
+多个 MCP Server 共享的 Chromium 进程
+
+    mcp-browser-daemon --port 9222 --idle-timeout 300
+
+各个 Server 通过 connect_over_cdp 连接并创建各自的浏览器上下文，上下文之间的 Cookie 和
+登录状态互相隔离。Playwright 创建的上下文在连接断开时自动销毁，因此上下文数量即为引用计数，
+没有上下文的时间超过 idle_timeout 后退出。
+"""
+
+import argparse
+import asyncio
+import logging
+import subprocess
+import sys
+import time
+from urllib.parse import urlsplit
+
+from playwright.async_api import Browser, Playwright, async_playwright
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+DEFAULT_PORT = 9222
+
+
+async def serve(
+    *,
+    port: int = DEFAULT_PORT,
+    headless: bool = False,
+    idle_timeout: float = 300,
+    poll_interval: float = 5,
+) -> None:
+    """
+    启动 Chromium 并在空闲时退出
+
+    Args:
+        port (int): 远程调试端口，只监听 127.0.0.1
+        headless (bool): 是否以无头模式启动浏览器
+        idle_timeout (float): 没有上下文时的最长存活时间，单位为秒，启动后第一个连接也受此限制
+        poll_interval (float): 检查上下文数量的间隔，单位为秒
+    """
+    try:
+        _, writer = await asyncio.open_connection("127.0.0.1", port)
+    except OSError:
+        pass
+    else:
+        # 其他 Server 已经启动了 daemon
+        writer.close()
+        logger.info(f"Port {port} is already in use, exiting")
+        return
+
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(
+            headless=headless, args=[f"--remote-debugging-port={port}"]
+        )
+        cdp = await browser.new_browser_cdp_session()
+        logger.info(f"Browser listening on http://127.0.0.1:{port}")
+
+        contexts = 0
+        idle_since: float | None = time.monotonic()
+        while browser.is_connected():
+            await asyncio.sleep(poll_interval)
+            result = await cdp.send("Target.getBrowserContexts")
+            count = len(result["browserContextIds"])
+            if count != contexts:
+                logger.info(f"Browser contexts: {contexts} -> {count}")
+                contexts = count
+            if count:
+                idle_since = None
+            elif idle_since is None:
+                idle_since = time.monotonic()
+            elif time.monotonic() - idle_since >= idle_timeout:
+                logger.info(f"No browser context for {idle_timeout}s, shutting down")
+                break
+        await browser.close()
+
+
+async def connect(
+    playwright: Playwright,
+    endpoint: str,
+    *,
+    autostart: bool = False,
+    headless: bool = False,
+    timeout: float = 15,
+) -> Browser:
+    """
+    通过 CDP 连接共享的浏览器
+
+    Args:
+        playwright (Playwright): Playwright 实例
+        endpoint (str): 远程调试地址，如 http://127.0.0.1:9222
+        autostart (bool): 连接失败时是否在后台启动 daemon，只支持本机地址
+        headless (bool): 自动启动的浏览器是否为无头模式
+        timeout (float): 自动启动后等待连接成功的最长时间，单位为秒
+
+    Returns:
+        Browser: 连接到的浏览器
+    """
+    try:
+        return await playwright.chromium.connect_over_cdp(endpoint)
+    except Exception:
+        if not autostart:
+            raise
+    port = urlsplit(endpoint).port or DEFAULT_PORT
+    logger.info(f"Starting browser daemon on port {port}")
+    await asyncio.create_subprocess_exec(
+        sys.executable,
+        "-c",
+        "from mcp_server_lib.daemon import main; main()",
+        "--port",
+        str(port),
+        *(["--headless"] if headless else []),
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        # 不随当前 Server 退出，由 daemon 自己在空闲时退出
+        start_new_session=True,
+    )
+    deadline = time.monotonic() + timeout
+    while True:
+        await asyncio.sleep(0.2)
+        try:
+            return await playwright.chromium.connect_over_cdp(endpoint)
+        except Exception:
+            if time.monotonic() >= deadline:
+                raise
+
+
+def main():
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+    parser = argparse.ArgumentParser(
+        description=(__doc__ or "").strip().partition("\n")[0]
+    )
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--headless", action="store_true")
+    parser.add_argument("--idle-timeout", type=float, default=300)
+    args = parser.parse_args()
+    try:
+        asyncio.run(
+            serve(
+                port=args.port, headless=args.headless, idle_timeout=args.idle_timeout
+            )
+        )
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
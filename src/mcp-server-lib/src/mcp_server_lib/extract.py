@@ -0,0 +1,195 @@
+import logging
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from typing import Literal
+
+from playwright.async_api import Locator
+
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+# number: 提取第一个数字，支持“万”“w”“k”后缀，没有数字时为 0
+# trim: 去除首尾空白
+Transform = Literal["number", "trim"]
+
+
+@dataclass(frozen=True)
+class Text:
+    """
+    元素的 innerText
+
+    Args:
+        selector (str | None): 相对当前元素的 CSS 选择器，为 None 时取当前元素，子元素用 `:scope > li`
+        many (bool): 是否返回所有匹配元素的列表
+        transform (Transform | None): 对结果的转换
+    """
+
+    selector: str | None = None
+    many: bool = False
+    transform: Transform | None = None
+
+    def compile(self) -> dict:
+        return {
+            "type": "text",
+            "selector": self.selector,
+            "many": self.many,
+            "transform": self.transform,
+        }
+
+
+@dataclass(frozen=True)
+class Attr:
+    """
+    元素的属性值
+
+    Args:
+        name (str): 属性名
+        selector (str | None): 相对当前元素的 CSS 选择器，为 None 时取当前元素
+        many (bool): 是否返回所有匹配元素的列表
+        transform (Transform | None): 对结果的转换
+    """
+
+    name: str
+    selector: str | None = None
+    many: bool = False
+    transform: Transform | None = None
+
+    def compile(self) -> dict:
+        return {
+            "type": "attr",
+            "name": self.name,
+            "selector": self.selector,
+            "many": self.many,
+            "transform": self.transform,
+        }
+
+
+@dataclass(frozen=True)
+class Count:
+    """匹配 selector 的元素数量"""
+
+    selector: str
+
+    def compile(self) -> dict:
+        return {"type": "count", "selector": self.selector}
+
+
+@dataclass(frozen=True)
+class Nested:
+    """
+    对匹配 selector 的元素递归提取 fields
+
+    Args:
+        selector (str): 相对当前元素的 CSS 选择器
+        fields (Mapping[str, Field]): 子元素的提取规则
+        many (bool): 是否返回所有匹配元素的列表
+    """
+
+    selector: str
+    fields: Mapping[str, "Field"] = field(default_factory=dict)
+    many: bool = True
+
+    def compile(self) -> dict:
+        return {
+            "type": "nested",
+            "selector": self.selector,
+            "many": self.many,
+            "fields": compile_fields(self.fields),
+        }
+
+
+Field = Text | Attr | Count | Nested
+
+
+def compile_fields(fields: Mapping[str, Field]) -> dict:
+    return {key: value.compile() for key, value in fields.items()}
+
+
+_EXTRACT_JS = """
+(root, fields) => {
+    const toNumber = (text) => {
+        const match = /(\\d+(?:\\.\\d+)?)\\s*([万wWkK])?/.exec(text);
+        if (!match) return 0;
+        const unit = { "万": 10000, w: 10000, W: 10000, k: 1000, K: 1000 }[match[2]] || 1;
+        return Math.round(parseFloat(match[1]) * unit);
+    };
+    const transform = (value, name) => {
+        if (value === null || value === undefined) return null;
+        if (name === "number") return toNumber(value);
+        if (name === "trim") return value.trim();
+        return value;
+    };
+    const valueOf = (element, spec) => {
+        if (spec.type === "text") return transform(element.innerText, spec.transform);
+        if (spec.type === "attr") return transform(element.getAttribute(spec.name), spec.transform);
+        if (spec.type === "nested") return extract(element, spec.fields);
+        return null;
+    };
+    const extract = (scope, fields) => {
+        const result = {};
+        for (const [key, spec] of Object.entries(fields)) {
+            if (spec.type === "count") {
+                result[key] = scope.querySelectorAll(spec.selector).length;
+            } else if (spec.many) {
+                const elements = spec.selector ? scope.querySelectorAll(spec.selector) : [scope];
+                result[key] = Array.from(elements, (element) => valueOf(element, spec));
+            } else {
+                const element = spec.selector ? scope.querySelector(spec.selector) : scope;
+                result[key] = element ? valueOf(element, spec) : null;
+            }
+        }
+        return result;
+    };
+    return EXTRACT_ROOT;
+}
+"""
+
+_EXTRACT_ONE_JS = _EXTRACT_JS.replace("EXTRACT_ROOT", "extract(root, fields)")
+_EXTRACT_ALL_JS = _EXTRACT_JS.replace(
+    "(root, fields) => {", "(root, [fields, after]) => {"
+).replace(
+    "EXTRACT_ROOT",
+    "root.filter((element) => !after || Number(element.getAttribute(after[0])) > after[1])"
+    ".map((element) => extract(element, fields))",
+)
+
+
+async def extract(locator: Locator, fields: Mapping[str, Field]) -> dict:
+    """
+    在一次 evaluate 中按 fields 提取 locator 对应元素的数据
+
+    Args:
+        locator (Locator): 根元素，必须唯一
+        fields (Mapping[str, Field]): 提取规则，键为结果字典的键
+
+    Returns:
+        dict: 提取结果，未匹配到的元素为 None
+    """
+    metrics.round_trip()
+    return await locator.evaluate(_EXTRACT_ONE_JS, compile_fields(fields))
+
+
+async def extract_all(
+    locator: Locator,
+    fields: Mapping[str, Field],
+    *,
+    after: tuple[str, float] | None = None,
+) -> list[dict]:
+    """
+    在一次 evaluate 中按 fields 提取 locator 匹配的所有元素的数据
+
+    Args:
+        locator (Locator): 根元素，可以匹配多个元素
+        fields (Mapping[str, Field]): 提取规则，键为结果字典的键
+        after (tuple[str, float] | None): (属性名, 值)，只提取该属性的数值大于值的元素，
+            用于增量提取无限滚动列表中新加载的条目
+
+    Returns:
+        list[dict]: 每个匹配元素的提取结果
+    """
+    metrics.round_trip()
+    return await locator.evaluate_all(
+        _EXTRACT_ALL_JS, [compile_fields(fields), list(after) if after else None]
+    )
@@ -0,0 +1,119 @@
+import asyncio
+import logging
+import time
+from collections import Counter
+from collections.abc import Awaitable, Callable
+
+from .browser import BrowserManager
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+# 调用一个需要登录的轻量接口，返回是否已登录
+LoginProbe = Callable[[], Awaitable[bool]]
+
+
+class LoginChecker:
+    """
+    检查登录状态并缓存结果
+
+    先检查上下文中的登录 Cookie 是否存在且未过期，缺少或过期时直接判定为未登录，
+    不发起任何请求；Cookie 有效时再调用 probe 确认服务端没有让会话失效。
+    结果缓存 ttl 秒，不会超过 Cookie 的过期时间。其他工具遇到鉴权错误或重新登录后
+    调用 invalidate，下次检查会重新判断。
+
+    Args:
+        manager (BrowserManager): 浏览器管理器，用于读取上下文的 Cookie
+        cookie_url (str): 读取 Cookie 的站点地址
+        cookie_names (tuple[str, ...]): 登录后写入的 Cookie，全部有效时才认为已登录
+        probe (LoginProbe | None): 确认登录状态的接口调用，为 None 时只检查 Cookie，
+            抛出的异常不会被缓存
+        ttl (float): 结果的缓存时间，单位为秒
+    """
+
+    def __init__(
+        self,
+        manager: BrowserManager,
+        *,
+        cookie_url: str,
+        cookie_names: tuple[str, ...],
+        probe: LoginProbe | None = None,
+        ttl: float = 300,
+    ):
+        self.manager = manager
+        self.cookie_url = cookie_url
+        self.cookie_names = cookie_names
+        self.probe = probe
+        self.ttl = ttl
+        # cached: 命中缓存；cookie: 只检查了 Cookie；probe: 调用了接口
+        self.checks: Counter[str] = Counter()
+        self._result: bool | None = None
+        self._expires_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def check(self) -> bool:
+        """
+        返回是否已登录
+
+        Returns:
+            bool: 是否已登录
+        """
+        cached = self.__cached()
+        if cached is not None:
+            self.checks["cached"] += 1
+            return cached
+        # 并发的检查只调用一次接口
+        async with self._lock:
+            cached = self.__cached()
+            if cached is not None:
+                self.checks["cached"] += 1
+                return cached
+            result, ttl = await self.__check()
+            self._result = result
+            self._expires_at = time.monotonic() + ttl
+            return result
+
+    def invalidate(self) -> None:
+        """丢弃缓存的结果，在遇到鉴权错误或登录状态变化时调用"""
+        if self._result is not None:
+            logger.info("Login status invalidated")
+        self._result = None
+        self._expires_at = 0.0
+
+    def samples(self) -> list[tuple[str, dict[str, str], float]]:
+        return [
+            ("login_checks_total", {"source": source}, n)
+            for source, n in sorted(self.checks.items())
+        ]
+
+    def __cached(self) -> bool | None:
+        """未过期的检查结果，没有时返回 None"""
+        if time.monotonic() < self._expires_at:
+            return self._result
+        return None
+
+    async def __check(self) -> tuple[bool, float]:
+        context = await self.manager.get_context()
+        cookies = {
+            cookie.get("name"): cookie
+            for cookie in await context.cookies(self.cookie_url)
+        }
+        now = time.time()
+        ttl = self.ttl
+        for name in self.cookie_names:
+            cookie = cookies.get(name)
+            if cookie is None or not cookie.get("value"):
+                self.checks["cookie"] += 1
+                return False, self.ttl
+            # 会话 Cookie 的 expires 为 -1
+            expires = cookie.get("expires", -1)
+            if expires > 0:
+                ttl = min(ttl, expires - now)
+        if ttl <= 0:
+            self.checks["cookie"] += 1
+            return False, self.ttl
+        if self.probe is None:
+            self.checks["cookie"] += 1
+            return True, ttl
+        self.checks["probe"] += 1
+        return await self.probe(), ttl
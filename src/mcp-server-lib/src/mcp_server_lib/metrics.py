@@ -0,0 +1,313 @@
+import asyncio
+import bisect
+import functools
+import logging
+import math
+import time
+from collections import Counter
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterable
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any
+
+from .progress import PartialResult
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, math.inf)
+ROUND_TRIP_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, math.inf)
+
+# (指标名, 标签, 值)
+Sample = tuple[str, dict[str, str], float]
+
+
+@dataclass
+class Histogram:
+    buckets: tuple[float, ...]
+    counts: list[int] = field(init=False)
+    sum: float = 0
+    count: int = 0
+
+    def __post_init__(self):
+        self.counts = [0] * len(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def as_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "buckets": {
+                _format_bound(bound): count
+                for bound, count in zip(self.buckets, self.cumulative())
+            },
+        }
+
+    def cumulative(self) -> list[int]:
+        total = 0
+        result = []
+        for count in self.counts:
+            total += count
+            result.append(total)
+        return result
+
+
+@dataclass
+class _Call:
+    tool: str
+    round_trips: int = 0
+
+
+_current_call: ContextVar[_Call | None] = ContextVar("current_call", default=None)
+
+
+class Metrics:
+    """
+    工具调用指标：耗时直方图、进行中的调用数、错误数、页面步骤耗时以及每次调用的
+    Playwright 往返次数
+
+    往返次数由 step 和 round_trip 显式记录，未被包裹的 Playwright 调用不会计入。
+    """
+
+    def __init__(self):
+        self.calls: Counter[str] = Counter()
+        self.errors: Counter[str] = Counter()
+        self.partials: Counter[str] = Counter()
+        self.in_flight: Counter[str] = Counter()
+        self.latency: dict[str, Histogram] = {}
+        self.round_trips: dict[str, Histogram] = {}
+        self.steps: dict[tuple[str, str], Histogram] = {}
+        self.collectors: list[Callable[[], Iterable[Sample]]] = []
+
+    def instrument(self, name: str | None = None):
+        """
+        记录异步函数的调用次数、耗时、错误数和往返次数
+
+        Args:
+            name (str | None): 工具名，默认为函数名
+        """
+
+        def decorator(
+            fn: Callable[..., Awaitable[Any]],
+        ) -> Callable[..., Awaitable[Any]]:
+            tool = name or fn.__name__
+
+            @functools.wraps(fn)
+            async def wrapper(*args, **kwargs):
+                call = _Call(tool=tool)
+                token = _current_call.set(call)
+                self.calls[tool] += 1
+                self.in_flight[tool] += 1
+                start = time.perf_counter()
+                try:
+                    return await fn(*args, **kwargs)
+                except PartialResult:
+                    self.partials[tool] += 1
+                    raise
+                except Exception:
+                    self.errors[tool] += 1
+                    raise
+                finally:
+                    self.in_flight[tool] -= 1
+                    self.__histogram(self.latency, tool, LATENCY_BUCKETS).observe(
+                        time.perf_counter() - start
+                    )
+                    self.__histogram(
+                        self.round_trips, tool, ROUND_TRIP_BUCKETS
+                    ).observe(call.round_trips)
+                    _current_call.reset(token)
+
+            return wrapper
+
+        return decorator
+
+    @asynccontextmanager
+    async def step(self, name: str, round_trips: int = 1) -> AsyncIterator[None]:
+        """
+        记录页面步骤（如 goto、等待选择器）的耗时，并计入当前调用的往返次数
+
+        Args:
+            name (str): 步骤名
+            round_trips (int): 该步骤包含的 Playwright 往返次数
+        """
+        call = _current_call.get()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            key = (call.tool if call else "", name)
+            self.__histogram(self.steps, key, LATENCY_BUCKETS).observe(
+                time.perf_counter() - start
+            )
+            self.round_trip(round_trips)
+
+    def round_trip(self, count: int = 1) -> None:
+        """计入当前调用的 Playwright 往返次数"""
+        call = _current_call.get()
+        if call is not None:
+            call.round_trips += count
+
+    def register(self, collector: Callable[[], Iterable[Sample]]) -> None:
+        """注册额外的指标来源，如缓存命中数"""
+        self.collectors.append(collector)
+
+    def unregister(self, collector: Callable[[], Iterable[Sample]]) -> None:
+        """移除 register 注册的指标来源，未注册时忽略"""
+        if collector in self.collectors:
+            self.collectors.remove(collector)
+
+    def snapshot(self) -> dict:
+        tools = self.calls.keys() | self.in_flight.keys()
+        return {
+            "tools": {
+                tool: {
+                    "calls": self.calls[tool],
+                    "errors": self.errors[tool],
+                    "partial_results": self.partials[tool],
+                    "in_flight": self.in_flight[tool],
+                    "latency_seconds": self.latency[tool].as_dict()
+                    if tool in self.latency
+                    else None,
+                    "round_trips": self.round_trips[tool].as_dict()
+                    if tool in self.round_trips
+                    else None,
+                }
+                for tool in sorted(tools)
+            },
+            "steps": [
+                {"tool": tool, "step": step, **histogram.as_dict()}
+                for (tool, step), histogram in sorted(self.steps.items())
+            ],
+            "samples": [
+                {"name": name, "labels": labels, "value": value}
+                for name, labels, value in self.__collect()
+            ],
+        }
+
+    def render_prometheus(self) -> str:
+        """以 Prometheus 文本格式输出指标"""
+        lines: list[str] = []
+
+        def counter(
+            metric: str, help: str, values: Counter[str], type: str = "counter"
+        ) -> None:
+            lines.append(f"# HELP {metric} {help}")
+            lines.append(f"# TYPE {metric} {type}")
+            for tool, value in sorted(values.items()):
+                lines.append(f"{metric}{_labels({'tool': tool})} {value}")
+
+        def histogram(
+            metric: str, help: str, values: dict[Any, Histogram], label_names: tuple
+        ) -> None:
+            lines.append(f"# HELP {metric} {help}")
+            lines.append(f"# TYPE {metric} histogram")
+            for key, h in sorted(values.items()):
+                key = key if isinstance(key, tuple) else (key,)
+                labels = dict(zip(label_names, key))
+                for bound, count in zip(h.buckets, h.cumulative()):
+                    le = {"le": _format_bound(bound)}
+                    lines.append(f"{metric}_bucket{_labels(labels | le)} {count}")
+                lines.append(f"{metric}_sum{_labels(labels)} {h.sum}")
+                lines.append(f"{metric}_count{_labels(labels)} {h.count}")
+
+        counter("mcp_tool_calls_total", "Tool calls.", self.calls)
+        counter("mcp_tool_errors_total", "Tool calls that raised.", self.errors)
+        counter(
+            "mcp_tool_partial_results_total",
+            "Tool calls that hit their deadline and returned partial results.",
+            self.partials,
+        )
+        counter(
+            "mcp_tool_in_flight", "Tool calls in progress.", self.in_flight, "gauge"
+        )
+        histogram("mcp_tool_duration_seconds", "Tool latency.", self.latency, ("tool",))
+        histogram(
+            "mcp_tool_round_trips",
+            "Playwright round trips per tool call.",
+            self.round_trips,
+            ("tool",),
+        )
+        histogram(
+            "mcp_step_duration_seconds",
+            "Page step latency.",
+            self.steps,
+            ("tool", "step"),
+        )
+        for name, labels, value in self.__collect():
+            lines.append(f"mcp_{name}{_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+    def __collect(self) -> list[Sample]:
+        samples = []
+        for collector in self.collectors:
+            try:
+                samples.extend(collector())
+            except Exception:
+                logger.exception("Metrics collector failed")
+        return samples
+
+    @staticmethod
+    def __histogram(
+        histograms: dict[Any, Histogram], key: Any, buckets: tuple[float, ...]
+    ) -> Histogram:
+        if key not in histograms:
+            histograms[key] = Histogram(buckets)
+        return histograms[key]
+
+
+metrics = Metrics()
+
+
+async def serve_prometheus(
+    host: str, port: int, registry: Metrics = metrics
+) -> asyncio.Server:
+    """
+    启动一个只返回 Prometheus 文本指标的 HTTP 服务
+
+    Args:
+        host (str): 监听地址
+        port (int): 监听端口
+        registry (Metrics): 指标来源
+    """
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            # 只读取请求头，不区分路径
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+            body = registry.render_prometheus().encode()
+            writer.write(
+                b"HTTP/1.1 200 OK\r\n"
+                b"Content-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+                + f"Content-Length: {len(body)}\r\n".encode()
+                + b"Connection: close\r\n\r\n"
+                + body
+            )
+            await writer.drain()
+        except Exception:
+            logger.exception("Failed to serve metrics")
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, host, port)
+    logger.info(f"Serving Prometheus metrics on http://{host}:{port}/metrics")
+    return server
+
+
+def _labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_bound(bound: float) -> str:
+    return "+Inf" if math.isinf(bound) else f"{bound:g}"
@@ -0,0 +1,81 @@
+import logging
+from dataclasses import dataclass
+from typing import Literal
+
+from playwright.async_api import Page
+
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+WaitUntil = Literal["commit", "domcontentloaded", "load", "networkidle"]
+
+
+class NavigationError(Exception):
+    """导航失败：HTTP 错误状态或页面出现了错误提示"""
+
+    def __init__(self, url: str, message: str):
+        super().__init__(f"{message}: {url}")
+        self.url = url
+        self.message = message
+
+
+@dataclass(frozen=True)
+class NavigationPolicy:
+    """
+    页面导航的等待策略
+
+    导航只等待到 wait_until，之后等待 ready_selector 出现，而不是等待所有请求结束。
+    error_selectors 中的任一元素先于 ready_selector 出现时立即失败，不再等待超时。
+
+    Args:
+        wait_until (WaitUntil): goto 等待的事件，通常 domcontentloaded 已经足够
+        ready_selector (str | None): 页面可用的标志元素，为 None 时不等待
+        error_selectors (tuple[str, ...]): 已知的错误页面元素，如登录弹窗、风控提示
+        goto_timeout_ms (float): goto 的超时时间，单位为毫秒
+        ready_timeout_ms (float): 等待 ready_selector 的超时时间，单位为毫秒
+        step_timeout_ms (float): 导航之后其他等待步骤的超时时间，单位为毫秒
+    """
+
+    wait_until: WaitUntil = "domcontentloaded"
+    ready_selector: str | None = None
+    error_selectors: tuple[str, ...] = ()
+    goto_timeout_ms: float = 15000
+    ready_timeout_ms: float = 10000
+    step_timeout_ms: float = 10000
+
+
+async def navigate(page: Page, url: str, policy: NavigationPolicy) -> None:
+    """
+    按 policy 导航到 url 并等待页面可用
+
+    Args:
+        page (Page): Playwright 页面对象
+        url (str): 目标地址
+        policy (NavigationPolicy): 等待策略
+
+    Raises:
+        NavigationError: 响应状态码不小于 400 或页面出现了 error_selectors 中的元素
+    """
+    async with metrics.step("goto"):
+        response = await page.goto(
+            url, wait_until=policy.wait_until, timeout=policy.goto_timeout_ms
+        )
+    if response is not None and response.status >= 400:
+        raise NavigationError(url, f"HTTP {response.status}")
+    if policy.ready_selector is None:
+        return
+
+    ready = page.locator(policy.ready_selector)
+    target = ready
+    for selector in policy.error_selectors:
+        target = target.or_(page.locator(selector))
+    async with metrics.step("wait_ready"):
+        await target.first.wait_for(timeout=policy.ready_timeout_ms)
+
+    for selector in policy.error_selectors:
+        error = page.locator(selector)
+        if await error.count() and not await ready.count():
+            logger.warning(f"Error page detected at {url}: {selector}")
+            raise NavigationError(url, f"error element {selector!r} is present")
@@ -0,0 +1,139 @@
+import json
+import logging
+from collections.abc import Collection, Sequence
+from typing import Any
+
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+# 截断单个对象时字符串最少保留的字符数
+MIN_STRING_CHARS = 16
+
+
+def select_fields(
+    model: type[BaseModel], fields: Collection[str] | None
+) -> frozenset[str] | None:
+    """
+    校验需要返回的字段
+
+    Args:
+        model (type[BaseModel]): 结果的模型类
+        fields (Collection[str] | None): 字段名，为 None 或空时返回全部字段
+
+    Returns:
+        frozenset[str] | None: 字段名集合，返回全部字段时为 None
+
+    Raises:
+        ValueError: 包含模型中不存在的字段
+    """
+    if not fields:
+        return None
+    unknown = sorted(set(fields) - model.model_fields.keys())
+    if unknown:
+        raise ValueError(
+            f"未知字段: {', '.join(unknown)}，可用字段: {', '.join(model.model_fields)}"
+        )
+    return frozenset(fields)
+
+
+def dump(
+    value: BaseModel | Sequence[BaseModel],
+    *,
+    fields: Collection[str] | None = None,
+    exclude_none: bool = True,
+    compact: bool = False,
+    max_chars: int | None = None,
+) -> str:
+    """
+    将工具结果序列化为文本
+
+    列表每行一个 JSON 对象。compact 模式下第一行为字段名数组，之后每行为对应的值数组，
+    不再重复字段名。超过 max_chars 时从末尾丢弃条目；单个对象则从最大的列表和字符串开始，
+    丢弃末尾的条目或截短文本，并加上 "truncated": true，输出始终是合法的 JSON。
+
+    Args:
+        value (BaseModel | Sequence[BaseModel]): 单个结果或结果列表
+        fields (Collection[str] | None): 只返回这些顶层字段，为 None 时返回全部字段
+        exclude_none (bool): 是否省略值为 None 的字段
+        compact (bool): 列表是否使用字段名数组加值数组的格式
+        max_chars (int | None): 输出的最大字符数，为 None 时不限制
+
+    Returns:
+        str: 序列化后的文本
+    """
+    include = set(fields) if fields else None
+    if isinstance(value, BaseModel):
+        text = value.model_dump_json(include=include, exclude_none=exclude_none)
+        if max_chars is None or len(text) <= max_chars:
+            return text
+        data = value.model_dump(mode="json", include=include, exclude_none=exclude_none)
+        data["truncated"] = True
+        truncated = _dumps(data)
+        while len(truncated) > max_chars and _shrink(data, len(truncated) - max_chars):
+            truncated = _dumps(data)
+        logger.debug(f"Output truncated from {len(text)} to {len(truncated)} chars")
+        return truncated
+
+    items = [
+        item.model_dump(mode="json", include=include, exclude_none=exclude_none)
+        for item in value
+    ]
+    if compact:
+        # 省略 None 后各条目的字段可能不同，取并集并按首次出现的顺序排列
+        keys = list(dict.fromkeys(key for item in items for key in item))
+        lines = [_dumps(keys)]
+        lines.extend(_dumps([item.get(key) for key in keys]) for item in items)
+        header = 1
+    else:
+        lines = [_dumps(item) for item in items]
+        header = 0
+
+    if max_chars is None:
+        return "\n".join(lines)
+    size = sum(len(line) + 1 for line in lines[:header])
+    end = header
+    while end < len(lines) and size + len(lines[end]) <= max_chars:
+        size += len(lines[end]) + 1
+        end += 1
+    if end < len(lines):
+        logger.debug(f"Output truncated to {end - header} of {len(items)} items")
+        return "\n".join([*lines[:end], f"…(已截断，省略 {len(lines) - end} 条)"])
+    return "\n".join(lines)
+
+
+def _dumps(value) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def _shrink(data: dict[str, Any], excess: int) -> bool:
+    """
+    缩小 data 中最大的可缩小字段，使序列化后的文本减少约 excess 个字符
+
+    Returns:
+        bool: 是否缩小了某个字段，没有可以缩小的字段时为 False
+    """
+    keys = sorted(data, key=lambda key: len(_dumps(data[key])), reverse=True)
+    return any(_shrink_item(data, key, excess) for key in keys)
+
+
+def _shrink_item(container: dict | list, key: Any, excess: int) -> bool:
+    value = container[key]
+    if isinstance(value, str):
+        keep = max(len(value) - excess - 1, MIN_STRING_CHARS)
+        if keep + 1 >= len(value):
+            return False
+        container[key] = f"{value[:keep]}…"
+        return True
+    if isinstance(value, dict):
+        return _shrink(value, excess)
+    if isinstance(value, list) and value:
+        # 先整条丢弃末尾的条目，最后一条比超出的部分还大时缩小它的内容
+        dropped = 0
+        while value and dropped + len(_dumps(value[-1])) + 1 <= excess:
+            dropped += len(_dumps(value.pop())) + 1
+        if not dropped and not _shrink_item(value, len(value) - 1, excess):
+            value.pop()
+        return True
+    return False
@@ -0,0 +1,179 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+
+from playwright.async_api import BrowserContext, Page
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+
+class PoolClosedError(RuntimeError):
+    """页面池已经关闭，调用方应该从新的页面池获取页面"""
+
+
+@dataclass
+class _IdlePage:
+    page: Page
+    released_at: float
+
+
+class PagePool:
+    """
+    预热页面池，复用 Page 以避免每次工具调用都创建和销毁页面
+
+    Args:
+        context (BrowserContext): 页面所属的浏览器上下文
+        max_size (int): 页面数量上限（包含正在使用的页面）
+        min_idle (int): 预热以及空闲回收时保留的最少空闲页面数
+        max_idle_seconds (float): 空闲页面的最长保留时间，单位为秒
+        max_uses (int): 单个页面的最大复用次数，达到后关闭并重建
+    """
+
+    def __init__(
+        self,
+        context: BrowserContext,
+        *,
+        max_size: int = 4,
+        min_idle: int = 1,
+        max_idle_seconds: float = 300,
+        max_uses: int = 50,
+    ):
+        self.context = context
+        self.max_size = max_size
+        self.min_idle = min(min_idle, max_size)
+        self.max_idle_seconds = max_idle_seconds
+        self.max_uses = max_uses
+
+        self._semaphore = asyncio.Semaphore(max_size)
+        self._idle: deque[_IdlePage] = deque()
+        self._uses: dict[Page, int] = {}
+        self._sweeper: asyncio.Task | None = None
+        self._closed = False
+        self._drained = asyncio.Event()
+
+    @property
+    def in_use(self) -> int:
+        """正在使用的页面数"""
+        return len(self._uses) - len(self._idle)
+
+    async def start(self) -> None:
+        """预热 min_idle 个页面并启动空闲回收任务"""
+        for _ in range(self.min_idle - len(self._idle)):
+            page = await self.context.new_page()
+            self._uses[page] = 0
+            self._idle.append(_IdlePage(page=page, released_at=time.monotonic()))
+        if self._sweeper is None:
+            self._sweeper = asyncio.create_task(self.__sweep())
+
+    async def close(self) -> None:
+        self._closed = True
+        if self._sweeper:
+            self._sweeper.cancel()
+            self._sweeper = None
+        while self._idle:
+            await self.__close_page(self._idle.pop().page)
+        if not self._uses:
+            self._drained.set()
+
+    async def drain(self, timeout: float) -> bool:
+        """
+        关闭页面池并等待正在使用的页面归还
+
+        Args:
+            timeout (float): 最长等待时间，单位为秒
+
+        Returns:
+            bool: 所有页面都已归还返回 True，超时返回 False
+        """
+        await self.close()
+        try:
+            await asyncio.wait_for(self._drained.wait(), timeout)
+            return True
+        except TimeoutError:
+            return False
+
+    async def acquire(self) -> Page:
+        """获取一个页面，池满时等待其他调用归还"""
+        if self._closed:
+            raise PoolClosedError("PagePool is closed")
+        await self._semaphore.acquire()
+        try:
+            if self._closed:
+                # 等待期间页面池被关闭
+                raise PoolClosedError("PagePool is closed")
+            while self._idle:
+                # 后进先出，优先复用最近使用过的页面
+                page = self._idle.pop().page
+                if not page.is_closed():
+                    return page
+                self._uses.pop(page, None)
+            page = await self.context.new_page()
+            self._uses[page] = 0
+            return page
+        except BaseException:
+            self._semaphore.release()
+            raise
+
+    async def release(self, page: Page, *, discard: bool = False) -> None:
+        """
+        归还页面，页面会被重置为 about:blank 后放回池中
+
+        Args:
+            page (Page): 由 acquire 获取的页面
+            discard (bool): 是否直接关闭该页面而不放回池中
+        """
+        try:
+            uses = self._uses.get(page, 0) + 1
+            self._uses[page] = uses
+            if discard or self._closed or uses >= self.max_uses or page.is_closed():
+                await self.__close_page(page)
+                return
+            try:
+                await page.goto("about:blank")
+            except Exception:
+                logger.info("Failed to reset page, discarding it")
+                await self.__close_page(page)
+                return
+            self._idle.append(_IdlePage(page=page, released_at=time.monotonic()))
+        finally:
+            self._semaphore.release()
+            if self._closed and not self._uses:
+                self._drained.set()
+
+    @asynccontextmanager
+    async def page(self) -> AsyncIterator[Page]:
+        """以异步上下文管理器的方式获取页面，出现异常的页面不再复用"""
+        page = await self.acquire()
+        try:
+            yield page
+        except BaseException:
+            await self.release(page, discard=True)
+            raise
+        else:
+            await self.release(page)
+
+    async def __close_page(self, page: Page) -> None:
+        self._uses.pop(page, None)
+        if page.is_closed():
+            return
+        try:
+            await page.close()
+        except Exception:
+            logger.debug("Failed to close page", exc_info=True)
+
+    async def __sweep(self) -> None:
+        interval = max(self.max_idle_seconds / 2, 1)
+        while True:
+            await asyncio.sleep(interval)
+            deadline = time.monotonic() - self.max_idle_seconds
+            # 队首是最早归还的页面
+            while len(self._idle) > self.min_idle and (
+                self._idle[0].released_at < deadline
+            ):
+                logger.debug("Evicting idle page")
+                await self.__close_page(self._idle.popleft().page)
@@ -0,0 +1,42 @@
+import os
+from pathlib import Path
+
+
+def process_tree_rss(root: int) -> int | None:
+    """
+    统计进程树的 RSS 之和
+
+    Args:
+        root (int): 根进程的 pid
+
+    Returns:
+        int | None: RSS 之和，单位为字节，不支持的平台（没有 /proc）返回 None
+    """
+    proc = Path("/proc")
+    if not proc.is_dir():
+        return None
+
+    children: dict[int, list[int]] = {}
+    rss: dict[int, int] = {}
+    page_size = os.sysconf("SC_PAGE_SIZE")
+    for entry in proc.iterdir():
+        if not entry.name.isdigit():
+            continue
+        try:
+            stat = (entry / "stat").read_text()
+            statm = (entry / "statm").read_text()
+        except OSError:
+            continue
+        # comm 字段可能包含空格，从最后一个右括号之后开始解析
+        ppid = int(stat.rsplit(")", 1)[1].split()[1])
+        pid = int(entry.name)
+        children.setdefault(ppid, []).append(pid)
+        rss[pid] = int(statm.split()[1]) * page_size
+
+    total = 0
+    stack = [root]
+    while stack:
+        pid = stack.pop()
+        total += rss.get(pid, 0)
+        stack.extend(children.get(pid, []))
+    return total
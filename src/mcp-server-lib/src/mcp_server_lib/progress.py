@@ -0,0 +1,62 @@
+import logging
+from collections.abc import Awaitable, Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+# (当前进度, 总量)，与 fastmcp.Context.report_progress 的签名一致
+ProgressCallback = Callable[[float, float | None], Awaitable[None]]
+
+_reporter: ContextVar[ProgressCallback | None] = ContextVar(
+    "progress_reporter", default=None
+)
+
+
+class PartialResult(Exception):
+    """
+    调用在截止时间前只完成了一部分，result 为已经得到的结果
+
+    以异常的形式返回，部分结果不会被写入缓存，合并的调用方也会收到同样的部分结果。
+    """
+
+    def __init__(self, result: Any):
+        super().__init__("Deadline exceeded, returning partial result")
+        self.result = result
+
+
+@contextmanager
+def progress_reporter(callback: ProgressCallback | None) -> Iterator[None]:
+    """
+    在当前上下文中设置进度回调，供 report_progress 使用
+
+    合并的并发调用只在第一个调用方的上下文中执行，其他调用方不会收到进度。
+
+    Args:
+        callback (ProgressCallback | None): 进度回调，如 ctx.report_progress
+    """
+    token = _reporter.set(callback)
+    try:
+        yield
+    finally:
+        _reporter.reset(token)
+
+
+async def report_progress(progress: float, total: float | None = None) -> None:
+    """
+    通过当前上下文的进度回调报告进度，没有回调时什么都不做
+
+    Args:
+        progress (float): 当前进度
+        total (float | None): 总量，未知时为 None
+    """
+    callback = _reporter.get()
+    if callback is None:
+        return
+    try:
+        await callback(progress, total)
+    except Exception:
+        # 进度通知失败不应影响工具调用本身
+        logger.debug("Failed to report progress", exc_info=True)
@@ -0,0 +1,100 @@
+import fnmatch
+import logging
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Literal
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+RouteAction = Literal["allow", "abort", "stub"]
+
+
+@dataclass(frozen=True)
+class RoutePolicy:
+    """
+    声明式的请求拦截策略
+
+    匹配优先级依次为 allow_url_globs、stub_url_globs、block_domains、block_url_globs、
+    block_resource_types。URL glob 使用 fnmatch 语义，`*` 可以匹配 `/`。
+
+    Args:
+        block_resource_types (frozenset[str]): 需要中止的资源类型，如 image、media、font
+        block_url_globs (tuple[str, ...]): 需要中止的 URL
+        block_domains (frozenset[str]): 需要中止的域名，同时匹配其子域名
+        stub_url_globs (tuple[str, ...]): 返回空响应而不是中止的 URL，适用于缺失后会导致页面报错的脚本
+        allow_url_globs (tuple[str, ...]): 始终放行的 URL
+    """
+
+    block_resource_types: frozenset[str] = frozenset()
+    block_url_globs: tuple[str, ...] = ()
+    block_domains: frozenset[str] = frozenset()
+    stub_url_globs: tuple[str, ...] = ()
+    allow_url_globs: tuple[str, ...] = ()
+
+    def decide(self, url: str, resource_type: str) -> RouteAction:
+        if _match_any(url, self.allow_url_globs):
+            return "allow"
+        if _match_any(url, self.stub_url_globs):
+            return "stub"
+        if self.block_domains and _match_domain(url, self.block_domains):
+            return "abort"
+        if _match_any(url, self.block_url_globs):
+            return "abort"
+        if resource_type in self.block_resource_types:
+            return "abort"
+        return "allow"
+
+
+ALLOW_ALL = RoutePolicy()
+
+
+@dataclass
+class RouteStats:
+    """请求拦截计数，按资源类型统计"""
+
+    blocked: Counter[str] = field(default_factory=Counter)
+    stubbed: Counter[str] = field(default_factory=Counter)
+
+    @property
+    def blocked_requests(self) -> int:
+        return self.blocked.total()
+
+    @property
+    def stubbed_requests(self) -> int:
+        return self.stubbed.total()
+
+    def record(self, action: RouteAction, resource_type: str) -> None:
+        if action == "abort":
+            self.blocked[resource_type] += 1
+        elif action == "stub":
+            self.stubbed[resource_type] += 1
+
+    def as_dict(self) -> dict:
+        return {
+            "blocked_requests": self.blocked_requests,
+            "stubbed_requests": self.stubbed_requests,
+            "blocked_by_type": dict(self.blocked),
+            "stubbed_by_type": dict(self.stubbed),
+        }
+
+    def samples(self) -> list[tuple[str, dict[str, str], float]]:
+        return [
+            (f"route_{kind}_requests_total", {"resource_type": type}, count)
+            for kind, counter in (("blocked", self.blocked), ("stubbed", self.stubbed))
+            for type, count in sorted(counter.items())
+        ]
+
+
+def _match_any(url: str, globs: tuple[str, ...]) -> bool:
+    return any(fnmatch.fnmatchcase(url, glob) for glob in globs)
+
+
+def _match_domain(url: str, domains: frozenset[str]) -> bool:
+    host = urlsplit(url).hostname or ""
+    while host:
+        if host in domains:
+            return True
+        _, _, host = host.partition(".")
+    return False
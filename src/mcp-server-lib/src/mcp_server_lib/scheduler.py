@@ -0,0 +1,230 @@
+import asyncio
+import functools
+import heapq
+import itertools
+import logging
+import time
+from collections import Counter
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from enum import IntEnum
+from typing import Any
+
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+
+class Priority(IntEnum):
+    """调度优先级，数值越小越先执行"""
+
+    INTERACTIVE = 0  # 登录、检查登录等需要用户等待的操作
+    NORMAL = 1
+    BULK = 2  # 批量抓取
+
+
+class QueueTimeoutError(Exception):
+    """
+    工具调用在队列中等待超时
+
+    Args:
+        tool (str): 工具名
+        waited (float): 在队列中等待的时间，单位为秒
+    """
+
+    def __init__(self, tool: str, waited: float):
+        super().__init__(f"{tool} waited {waited:.1f}s in queue")
+        self.tool = tool
+        self.waited = waited
+
+
+class TokenBucket:
+    """
+    令牌桶限流
+
+    Args:
+        rate (float): 每秒补充的令牌数
+        burst (int): 桶容量，即允许的突发请求数
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+
+    def reserve(self) -> float:
+        """预留一个令牌，返回拿到令牌前需要等待的秒数"""
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        # 令牌可以透支，后面的调用方按透支的数量依次等待
+        self._tokens -= 1
+        return max(0.0, -self._tokens / self.rate)
+
+    def refund(self) -> None:
+        """归还未使用的令牌"""
+        self._tokens = min(self.burst, self._tokens + 1)
+
+
+class Scheduler:
+    """
+    工具调用调度器：限制并发数，按优先级排队，并按令牌桶限制访问站点的频率
+
+    优先级相同的调用先到先得。令牌在拿到并发名额后获取，因此限流不会打乱优先级顺序。
+
+    Args:
+        name (str): 站点名，用作指标标签
+        max_concurrency (int): 同时执行的调用数上限
+        rate (float | None): 每秒允许开始的调用数，为 None 时不限流
+        burst (int): 允许的突发调用数
+        queue_timeout (float | None): 排队（包括等待令牌）的最长时间，单位为秒，
+            为 None 时一直等待
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        max_concurrency: int = 4,
+        rate: float | None = None,
+        burst: int = 1,
+        queue_timeout: float | None = 60,
+    ):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.bucket = TokenBucket(rate, burst) if rate else None
+        self.queue_timeout = queue_timeout
+        self.timeouts: Counter[str] = Counter()
+        self._active = 0
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+
+    @property
+    def active(self) -> int:
+        """正在执行的调用数"""
+        return self._active
+
+    def queue_depth(self) -> Counter[Priority]:
+        """按优先级统计排队的调用数"""
+        return Counter(
+            Priority(priority)
+            for priority, _, waiter in self._waiters
+            if not waiter.done()
+        )
+
+    @asynccontextmanager
+    async def slot(
+        self, tool: str, priority: Priority = Priority.NORMAL
+    ) -> AsyncIterator[None]:
+        """
+        等待执行名额，退出时归还
+
+        Args:
+            tool (str): 工具名，用于统计超时次数
+            priority (Priority): 优先级
+
+        Raises:
+            QueueTimeoutError: 等待超过 queue_timeout
+        """
+        start = time.monotonic()
+        try:
+            async with metrics.step("queue", round_trips=0):
+                async with asyncio.timeout(self.queue_timeout):
+                    await self.__acquire(priority)
+                    try:
+                        await self.__throttle()
+                    except BaseException:
+                        self.__release()
+                        raise
+        except TimeoutError:
+            self.timeouts[tool] += 1
+            logger.warning(f"{tool} timed out in {self.name} queue")
+            raise QueueTimeoutError(tool, time.monotonic() - start) from None
+        try:
+            yield
+        finally:
+            self.__release()
+
+    def samples(self) -> list[tuple[str, dict[str, str], float]]:
+        depth = self.queue_depth()
+        return [
+            *(
+                (
+                    "scheduler_queue_depth",
+                    {"site": self.name, "priority": priority.name.lower()},
+                    depth[priority],
+                )
+                for priority in Priority
+            ),
+            ("scheduler_active_calls", {"site": self.name}, self._active),
+            *(
+                ("scheduler_queue_timeouts_total", {"site": self.name, "tool": tool}, n)
+                for tool, n in sorted(self.timeouts.items())
+            ),
+        ]
+
+    async def __acquire(self, priority: Priority) -> None:
+        if self._active < self.max_concurrency and not self.queue_depth():
+            self._active += 1
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), waiter))
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # 取消时名额已经转交给了当前调用方
+                self.__release()
+            raise
+
+    def __release(self) -> None:
+        # 名额直接转交给优先级最高的等待者，已取消的等待者留在堆中，在这里跳过
+        while self._waiters:
+            _, _, waiter = heapq.heappop(self._waiters)
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self._active -= 1
+
+    async def __throttle(self) -> None:
+        if self.bucket is None:
+            return
+        delay = self.bucket.reserve()
+        if delay <= 0:
+            return
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self.bucket.refund()
+            raise
+
+
+def scheduled(
+    priority: Priority = Priority.NORMAL, *, name: str | None = None
+) -> Callable[[Callable[..., Awaitable[Any]]], Callable[..., Awaitable[Any]]]:
+    """
+    通过调度器执行异步方法
+
+    被装饰的方法所属的对象需要提供 scheduler 属性（Scheduler | None），为 None 时直接执行。
+
+    Args:
+        priority (Priority): 优先级
+        name (str | None): 工具名，默认为方法名
+    """
+
+    def decorator(fn: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+        tool = name or fn.__name__
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            scheduler: Scheduler | None = getattr(args[0], "scheduler", None)
+            if scheduler is None:
+                return await fn(*args, **kwargs)
+            async with scheduler.slot(tool, priority):
+                return await fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
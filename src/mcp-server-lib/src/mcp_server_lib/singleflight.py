@@ -0,0 +1,106 @@
+import asyncio
+import functools
+import inspect
+import logging
+from collections import Counter
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import Any
+
+from .cache import bind_arguments, make_key
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+
+@dataclass
+class _Call:
+    task: asyncio.Task
+    waiters: int = 0
+
+
+class SingleFlight:
+    """
+    合并相同参数的并发调用，调用方共享同一次执行的结果或异常
+
+    单个调用方被取消不会影响其他调用方，所有调用方都取消后才会取消正在执行的任务。
+    """
+
+    def __init__(self):
+        self.coalesced: Counter[str] = Counter()
+        self._calls: dict[tuple[str, str], _Call] = {}
+
+    async def do(
+        self,
+        tool: str,
+        args: dict[str, Any],
+        fn: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """
+        执行 fn，相同 tool 和 args 的调用正在进行时等待其结果
+
+        Args:
+            tool (str): 工具名
+            args (dict[str, Any]): 工具参数，用于判断是否为相同调用
+            fn (Callable[[], Awaitable[Any]]): 实际执行的函数
+        """
+        key = (tool, make_key(args))
+        call = self._calls.get(key)
+        if call is None:
+            call = _Call(task=asyncio.ensure_future(fn()))
+            call.task.add_done_callback(functools.partial(self.__forget, key, call))
+            self._calls[key] = call
+        else:
+            self.coalesced[tool] += 1
+            logger.debug(f"Coalesced call to {tool}")
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                # 所有调用方都已取消，新的调用需要重新执行
+                self.__forget(key, call)
+                call.task.cancel()
+
+    def samples(self) -> list[tuple[str, dict[str, str], float]]:
+        return [
+            ("coalesced_calls_total", {"tool": tool}, count)
+            for tool, count in sorted(self.coalesced.items())
+        ]
+
+    def __forget(self, key: tuple[str, str], call: _Call, *_) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+
+def coalesced(*, name: str | None = None, exclude: tuple[str, ...] = ()):
+    """
+    合并异步方法的相同参数的并发调用
+
+    被装饰的方法所属的对象需要提供 flights 属性（SingleFlight | None），为 None 时不合并。
+
+    Args:
+        name (str | None): 工具名，默认为方法名
+        exclude (tuple[str, ...]): 不参与判断是否为相同调用的参数名
+    """
+
+    def decorator(fn: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+        tool = name or fn.__name__
+        signature = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            flights: SingleFlight | None = getattr(args[0], "flights", None)
+            if flights is None:
+                return await fn(*args, **kwargs)
+            return await flights.do(
+                tool,
+                bind_arguments(signature, args, kwargs, exclude),
+                lambda: fn(*args, **kwargs),
+            )
+
+        return wrapper
+
+    return decorator
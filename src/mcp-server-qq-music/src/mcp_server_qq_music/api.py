@@ -0,0 +1,462 @@
+import base64
+import binascii
+import html
+import json
+import logging
+import re
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from types import MappingProxyType
+from typing import Any
+from urllib.parse import urlsplit
+
+from mcp_server_lib import BrowserManager, metrics
+
+from .models import Comment, CommentGroup, CommentReply, LyricLine, Song
+
+logger = logging.getLogger(__name__)
+
+# 歌词行首的时间戳和 [ti:xxx] 等标签
+LRC_TAGS = re.compile(r"^(\[[^\]]*\])+")
+LRC_TIMESTAMP = re.compile(r"\[(\d+):(\d+(?:\.\d+)?)\]")
+# 评论时间按北京时间显示，与页面一致
+CHINA_TZ = timezone(timedelta(hours=8))
+# 评论游标中的字段及其类型
+CURSOR_FIELDS = MappingProxyType(
+    {
+        "mid": (str,),
+        "group": (str,),
+        "comment_id": (str, type(None)),
+        "song_id": (int,),
+        "page": (int,),
+        "seq": (str,),
+    }
+)
+# 未登录或登录已过期时接口返回的错误码
+AUTH_ERROR_CODES = frozenset({1000})
+
+
+class QQMusicApiError(Exception):
+    """QQ 音乐接口返回了错误状态码或错误码"""
+
+    def __init__(
+        self,
+        method: str,
+        url: str,
+        status_code: int,
+        body: Any = None,
+    ):
+        super().__init__("QQ Music API Error")
+        self.method = method
+        self.url = url
+        self.status_code = status_code
+        self.body = body
+
+    @property
+    def auth_failed(self) -> bool:
+        """是否因为未登录或登录过期而失败"""
+        if self.status_code in (401, 403):
+            return True
+        if not isinstance(self.body, dict):
+            return False
+        codes = {self.body.get("code"), (self.body.get("req_1") or {}).get("code")}
+        return not codes.isdisjoint(AUTH_ERROR_CODES)
+
+    def __str__(self):
+        return (
+            f"QQMusicApiError: {self.method} {self.url} "
+            f"Status Code: {self.status_code}, "
+            f"Body: {self.body}"
+        )
+
+
+@dataclass
+class CommentList:
+    """评论接口返回的一页评论"""
+
+    comments: list[Comment]
+    total: int | None  # 评论总数，接口未返回时为 None
+    has_more: bool
+    last_seq_no: str  # 本页最后一条评论的序号，获取下一页时使用
+
+
+def encode_cursor(state: dict[str, Any]) -> str:
+    """将分页状态编码为不透明的游标"""
+    raw = json.dumps(state, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> dict[str, Any]:
+    """
+    解码 encode_cursor 生成的游标，并校验 CURSOR_FIELDS 中的字段
+
+    Raises:
+        ValueError: 游标无效
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        state = json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError):
+        raise ValueError("无效的游标") from None
+    if not isinstance(state, dict) or any(
+        # bool 是 int 的子类，不能当作页码或 id
+        key not in state
+        or isinstance(state[key], bool)
+        or not isinstance(state[key], types)
+        for key, types in CURSOR_FIELDS.items()
+    ):
+        raise ValueError("无效的游标")
+    return state
+
+
+def parse_lrc(lrc: str) -> dict[float, str]:
+    """
+    解析 LRC 歌词，一行有多个时间戳时每个时间戳各对应一行
+
+    Args:
+        lrc (str): LRC 文本
+
+    Returns:
+        dict[float, str]: 开始时间（秒）-> 歌词，按时间排序，不包含 [ti:xxx] 等标签行
+    """
+    lines: dict[float, str] = {}
+    for line in lrc.splitlines():
+        times, pos = [], 0
+        while match := LRC_TIMESTAMP.match(line, pos):
+            times.append(round(int(match[1]) * 60 + float(match[2]), 2))
+            pos = match.end()
+        for time in times:
+            lines[time] = line[pos:].strip()
+    return dict(sorted(lines.items()))
+
+
+def lyric_lines(lyric: str, trans: str = "") -> list[LyricLine]:
+    """
+    合并原文和翻译的 LRC 歌词，翻译按时间戳对应到原文
+
+    Args:
+        lyric (str): 原文 LRC
+        trans (str): 翻译 LRC，没有翻译时为空
+
+    Returns:
+        list[LyricLine]: 歌词行，原文没有时间戳时 time 为 None
+    """
+    timed = parse_lrc(lyric)
+    if not timed:
+        # 纯文本歌词，如 "此歌曲为没有填词的纯音乐，请您欣赏"
+        texts = (LRC_TAGS.sub("", line).strip() for line in lyric.splitlines())
+        return [LyricLine(time=None, text=text) for text in texts if text]
+    translations = parse_lrc(trans)
+    lines = []
+    for time, text in timed.items():
+        if not text:
+            continue
+        # 没有翻译的行用 // 占位
+        translation = translations.get(time)
+        lines.append(
+            LyricLine(
+                time=time,
+                text=text,
+                translation=translation if translation not in ("", "//") else None,
+            )
+        )
+    return lines
+
+
+def song_mid(link: str) -> str:
+    """
+    从歌曲链接中取出歌曲 mid
+
+    Args:
+        link (str): 歌曲链接，如 "/n/ryqq/songDetail/002nHTx62ug8MZ"
+
+    Returns:
+        str: 歌曲 mid，如 "002nHTx62ug8MZ"
+    """
+    return urlsplit(link).path.rstrip("/").rsplit("/", 1)[-1]
+
+
+def songs_from_search_result(data: dict[str, Any]) -> list[Song]:
+    """
+    将 musicu.fcg 搜索接口的响应转换为歌曲列表
+
+    Args:
+        data (dict[str, Any]): 接口返回的 JSON，请求的键名（如 req_1）不固定
+
+    Returns:
+        list[Song]: 歌曲列表
+
+    Raises:
+        ValueError: 响应中没有搜索结果
+    """
+    for value in data.values():
+        try:
+            items = value["data"]["body"]["song"]["list"]
+        except (TypeError, KeyError):
+            continue
+        return [song_from_track(item) for item in items]
+    raise ValueError("No search result in response")
+
+
+def song_from_track(track: dict[str, Any]) -> Song:
+    """
+    将接口中的歌曲信息（搜索结果的条目或歌曲详情的 track_info）转换为 Song
+
+    Args:
+        track (dict[str, Any]): 歌曲信息
+
+    Returns:
+        Song: 不包含歌词和评论的歌曲
+    """
+    minutes, seconds = divmod(track.get("interval") or 0, 60)
+    album = track.get("album") or {}
+    return Song(
+        title=track.get("title") or track["name"],
+        artists=[singer["name"] for singer in track.get("singer", [])],
+        link=f"/n/ryqq/songDetail/{track['mid']}",
+        cover=f"https://y.qq.com/music/photo_new/T002R300x300M000{album['mid']}.jpg"
+        if album.get("mid")
+        else None,
+        album=album.get("name") or None,
+        duration=f"{minutes:02d}:{seconds:02d}",
+    )
+
+
+class QQMusicApi:
+    """
+    不打开页面，通过浏览器上下文的 request 直接调用 QQ 音乐的接口
+
+    请求与页面共享同一个 Cookie，因此登录状态与浏览器一致。
+
+    Args:
+        manager (BrowserManager): 浏览器管理器
+        on_auth_error (Callable[[], None] | None): 接口因未登录或登录过期失败时的回调
+    """
+
+    API_URL = "https://u.y.qq.com/cgi-bin/musicu.fcg"
+    LYRIC_URL = "https://c.y.qq.com/lyric/fcgi-bin/fcg_query_lyric_new.fcg"
+    REFERER = "https://y.qq.com/"
+    COMMENT_MODULE = "music.globalComment.CommentRead"
+    # 评论组 -> 评论接口的方法名，replies 为某条评论的全部回复
+    COMMENT_METHODS = MappingProxyType(
+        {
+            "hot": "GetHotCommentList",
+            "latest": "GetNewCommentList",
+            "replies": "GetSubCommentList",
+        }
+    )
+    COOKIE_URL = "https://y.qq.com"
+    # 登录后写入的 Cookie，同时存在时认为已登录
+    LOGIN_COOKIES = ("uin", "qqmusic_key")
+    # 获取当前登录用户信息，只有登录后才会返回成功
+    LOGIN_PROBE = ("music.UserInfo.userInfoServer", "GetLoginUserInfo")
+
+    manager: BrowserManager
+    on_auth_error: Callable[[], None] | None
+
+    def __init__(
+        self,
+        manager: BrowserManager,
+        on_auth_error: Callable[[], None] | None = None,
+    ):
+        self.manager = manager
+        self.on_auth_error = on_auth_error
+
+    async def probe_login(self) -> bool:
+        """
+        调用需要登录的用户信息接口，确认 Cookie 对应的会话仍然有效
+
+        Returns:
+            bool: 是否已登录
+        """
+        module, method = self.LOGIN_PROBE
+        async with metrics.step("api_login_probe"):
+            try:
+                data = await self.__musicu(module, method, {})
+            except QQMusicApiError as e:
+                if e.auth_failed:
+                    return False
+                raise
+        return bool(data)
+
+    async def search_songs(self, keyword: str) -> list[Song]:
+        """
+        搜索歌曲
+
+        Args:
+            keyword (str): 搜索关键词
+
+        Returns:
+            list[Song]: 歌曲列表
+        """
+        async with metrics.step("api_search"):
+            data = await self.__musicu(
+                "music.search.SearchCgiService",
+                "DoSearchForQQMusicDesktop",
+                {"query": keyword, "num_per_page": 20, "page_num": 1, "search_type": 0},
+            )
+        return songs_from_search_result({"req_1": {"data": data}})
+
+    async def get_song_detail(self, mid: str) -> tuple[Song, int]:
+        """
+        获取歌曲基本信息
+
+        Args:
+            mid (str): 歌曲 mid
+
+        Returns:
+            tuple[Song, int]: 不包含歌词和评论的歌曲，以及评论接口使用的歌曲 id
+        """
+        async with metrics.step("api_song_detail"):
+            data = await self.__musicu(
+                "music.pf_song_detail_svr", "get_song_detail_yqq", {"song_mid": mid}
+            )
+        track = data["track_info"]
+        return song_from_track(track), track["id"]
+
+    async def get_lyrics(self, mid: str) -> list[LyricLine]:
+        """
+        获取带时间戳的完整歌词，有翻译时一并返回
+
+        Args:
+            mid (str): 歌曲 mid
+
+        Returns:
+            list[LyricLine]: 歌词行，纯音乐或没有歌词的歌曲为空列表
+
+        Raises:
+            QQMusicApiError: 请求失败或未登录
+        """
+        context = await self.manager.get_context()
+        async with metrics.step("api_lyrics"):
+            resp = await context.request.get(
+                self.LYRIC_URL,
+                params={"songmid": mid, "format": "json", "nobase64": 1},
+                headers={"Referer": self.REFERER},
+            )
+            if not resp.ok:
+                raise self.__error(QQMusicApiError("get", resp.url, resp.status))
+            body = await resp.json()
+        if body.get("retcode", body.get("code")) != 0:
+            error = QQMusicApiError("get", resp.url, resp.status, body)
+            if error.auth_failed:
+                raise self.__error(error)
+            # 纯音乐、没有版权的歌曲不返回歌词
+            logger.debug(f"No lyrics for {mid}: {body}")
+            return []
+        return lyric_lines(
+            html.unescape(body.get("lyric") or ""),
+            html.unescape(body.get("trans") or ""),
+        )
+
+    async def get_comment_groups(self, song_id: int) -> list[CommentGroup]:
+        """
+        获取热门评论的第一页
+
+        Args:
+            song_id (int): 歌曲 id
+
+        Returns:
+            list[CommentGroup]: 评论组列表
+        """
+        page = await self.get_comments(song_id, "hot", page_size=15)
+        return [CommentGroup(name="精彩评论", comments=page.comments)]
+
+    async def get_comments(
+        self,
+        song_id: int,
+        group: str,
+        *,
+        page_num: int = 0,
+        page_size: int = 20,
+        last_seq_no: str = "",
+        comment_id: str | None = None,
+    ) -> CommentList:
+        """
+        获取一页评论
+
+        Args:
+            song_id (int): 歌曲 id
+            group (str): COMMENT_METHODS 中的评论组
+            page_num (int): 页码，从 0 开始
+            page_size (int): 每页评论数
+            last_seq_no (str): 上一页最后一条评论的序号，第一页为空
+            comment_id (str | None): group 为 replies 时回复的评论 id
+
+        Returns:
+            CommentList: 一页评论
+        """
+        param: dict[str, Any] = {
+            "BizType": 1,
+            "BizId": str(song_id),
+            "LastCommentSeqNo": last_seq_no,
+            "PageSize": page_size,
+            "PageNum": page_num,
+            "WithAirborne": 0,
+            "PicEnable": 1,
+        }
+        if group == "hot":
+            param["HotType"] = 1
+        if comment_id is not None:
+            param["CmId"] = comment_id
+        async with metrics.step("api_comments"):
+            data = await self.__musicu(
+                self.COMMENT_MODULE, self.COMMENT_METHODS[group], param
+            )
+        comment_list = data.get("CommentList") or {}
+        items = comment_list.get("Comments") or []
+        return CommentList(
+            comments=[self.__comment(item) for item in items],
+            total=comment_list.get("TotalNum"),
+            has_more=bool(comment_list.get("HasMore")),
+            last_seq_no=str(items[-1].get("SeqNo", "")) if items else last_seq_no,
+        )
+
+    def __comment(self, item: dict[str, Any]) -> Comment:
+        date = datetime.fromtimestamp(int(item.get("PubTime") or 0), CHINA_TZ)
+        date_and_location = f"{date.year}年{date.month}月{date.day}日"
+        if item.get("IPLocation"):
+            date_and_location += f" 来自{item['IPLocation']}"
+        replies = item.get("SubComments") or []
+        return Comment(
+            username=item.get("Nick", ""),
+            date_and_location=date_and_location,
+            content=html.unescape(item.get("Content", "")),
+            likes=item.get("PraiseNum") or 0,
+            reply_count=item.get("ReplyCnt") or len(replies),
+            id=item.get("CmId"),
+            replies=[
+                CommentReply(
+                    username=reply.get("Nick", ""),
+                    content=html.unescape(reply.get("Content", "")),
+                    likes=reply.get("PraiseNum") or 0,
+                )
+                for reply in replies
+            ],
+        )
+
+    async def __musicu(
+        self, module: str, method: str, param: dict[str, Any]
+    ) -> dict[str, Any]:
+        context = await self.manager.get_context()
+        resp = await context.request.post(
+            self.API_URL,
+            data={
+                "comm": {"ct": 24, "cv": 0},
+                "req_1": {"module": module, "method": method, "param": param},
+            },
+            headers={"Referer": self.REFERER},
+        )
+        if not resp.ok:
+            raise self.__error(QQMusicApiError("post", resp.url, resp.status))
+        body = await resp.json()
+        req = body.get("req_1") or {}
+        if body.get("code") != 0 or req.get("code") != 0:
+            raise self.__error(QQMusicApiError("post", resp.url, resp.status, body))
+        return req.get("data") or {}
+
+    def __error(self, error: QQMusicApiError) -> QQMusicApiError:
+        if error.auth_failed and self.on_auth_error is not None:
+            self.on_auth_error()
+        return error
@@ -1,90 +1,276 @@
+import asyncio
 import logging
-
-from mcp_server_lib import wait_for_stable
-from playwright.async_api import Browser, BrowserContext, Locator, Page
-from pydantic import BaseModel
+import time
+from collections.abc import AsyncGenerator, Awaitable, Callable
+from types import MappingProxyType
+from typing import Any, Literal
+from urllib.parse import urlsplit
+
+from mcp_server_lib import (
+    ALLOW_ALL,
+    Attr,
+    BrowserManager,
+    Count,
+    LoginChecker,
+    NavigationPolicy,
+    Nested,
+    PartialResult,
+    Priority,
+    RoutePolicy,
+    Scheduler,
+    SingleFlight,
+    Text,
+    ToolCache,
+    cached,
+    coalesced,
+    extract,
+    extract_all,
+    metrics,
+    navigate,
+    progress_reporter,
+    report_progress,
+    scheduled,
+)
+from playwright.async_api import Locator, Page, Response
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+from .api import (
+    QQMusicApi,
+    decode_cursor,
+    encode_cursor,
+    song_mid,
+    songs_from_search_result,
+)
+from .catalog import SongCatalog
+from .models import (
+    Comment,
+    CommentGroup,
+    CommentPage,
+    CommentReply,
+    LyricLine,
+    Song,
+    SongBatch,
+    SongBatchItem,
+)
 
 logger = logging.getLogger(__name__)
 
-
-class CommentGroup(BaseModel):
-    name: str  # 评论组名称
-    comments: list["Comment"]  # 评论列表
-
-
-class Comment(BaseModel):
-    username: str  # 用户名
-    date_and_location: str  # 评论日期和IP属地
-    content: str  # 评论内容
-    likes: int  # 点赞数
-    reply_count: int  # 回复数
-    replies: list["CommentReply"] | None  # 回复列表
-
-
-class CommentReply(BaseModel):
-    username: str  # 回复用户名
-    content: str  # 回复内容
-    likes: int  # 点赞数
-
-
-class Song(BaseModel):
-    title: str  # 歌名
-    about: str | None = None  # 简介
-    artists: list[str]  # 歌手
-    link: str | None = None  # 歌曲链接
-    cover: str | None = None  # 封面
-    album: str | None = None  # 专辑
-    duration: str | None = None  # 时长
-    lyrics: list[str] | None = None  # 歌词
-    comments: list[CommentGroup] | None = None  # 评论组列表
+# api: 只通过接口获取；browser: 只通过页面抓取；auto: 优先接口，失败时回退到页面
+ClientMode = Literal["api", "browser", "auto"]
+
+
+# 搜索结果中每首歌曲的提取规则
+SONG_LIST_ITEM_FIELDS = {
+    "title": Attr("title", ".songlist__songname_txt a"),
+    "link": Attr("href", ".songlist__songname_txt a"),
+    "artists": Attr("title", ".songlist__artist a", many=True),
+    "album": Text(".songlist__album a"),
+    "duration": Text(".songlist__time"),
+}
+
+# 歌曲详情页 .mod_data 的提取规则
+SONG_INFO_FIELDS = {
+    "title": Attr("title", ".data__name_txt"),
+    "artists": Attr("title", ".data__singer_txt", many=True),
+    "album": Attr("title", ".data_info__item_song a"),
+    "cover": Attr("src", ".data__cover .data__photo"),
+}
+
+LYRICS_FIELDS = {
+    "lines": Text("p span", many=True),
+}
+
+# 评论回复未展开时，用户名和内容都在 .comment__text 中
+UNEXPANDED_REPLY_FIELDS = {
+    "username": Text(".comment__text span a"),
+    "content": Text(".comment__text span span"),
+    "likes": Text(".comment__zan", transform="number"),
+}
+
+EXPANDED_REPLY_FIELDS = {
+    "username": Text(".comment__title > a"),
+    "content": Text(".comment__text span"),
+    "likes": Text(".comment__zan", transform="number"),
+}
+
+COMMENT_GROUP_FIELDS = {
+    "name": Text(".comment_type__title"),
+    "comments": Nested(
+        ":scope > ul.comment__list > li",
+        {
+            "username": Text(":scope > div:first-of-type .comment__title > a"),
+            "date_and_location": Text(":scope > div:first-of-type .comment__date"),
+            "content": Text(":scope > div:first-of-type .comment__text span"),
+            "likes": Text(
+                ":scope > div:first-of-type .comment__zan", transform="number"
+            ),
+            # 查看 x 条回复
+            "reply_count": Text(
+                ".comment__reply .comment__reply_hd a", transform="number"
+            ),
+            "reply_list_count": Count(".comment__reply ul.comment__list"),
+            "unexpanded_replies": Nested(
+                ".comment__reply ul.comment__list > li", UNEXPANDED_REPLY_FIELDS
+            ),
+            "expanded_replies": Nested(
+                ".comment__reply ul.comment__list > li", EXPANDED_REPLY_FIELDS
+            ),
+        },
+    ),
+}
 
 
 class QQMusic:
     BASE_URL = "https://y.qq.com"
+    # 抓取只读取封面的 src 属性，图片、媒体和字体不需要真正加载
+    ROUTE_POLICY = RoutePolicy(
+        block_resource_types=frozenset({"image", "media", "font"}),
+        block_domains=frozenset(
+            {
+                "aegis.qq.com",
+                "btrace.qq.com",
+                "h.trace.qq.com",
+                "pingjs.qq.com",
+                "tajs.qq.com",
+            }
+        ),
+    )
+    # 各操作的导航策略：只等待需要读取的元素出现，不等待统计脚本等请求结束
+    HOME_NAVIGATION = NavigationPolicy(ready_selector=".mod_header .top_login__link")
+    # 有登录 Cookie 时等待页头水合出个人主页链接的时间，单位为毫秒；
+    # 未登录时链接不会出现，不能按导航的步骤超时等待
+    LOGIN_HREF_TIMEOUT_MS = 3000
+    # 搜索结果可能在加载提示出现前就已经渲染完成
+    SEARCH_READY_SELECTOR = ".result .mod_loading, .result .songlist__list"
+    SEARCH_NAVIGATION = NavigationPolicy(ready_selector=SEARCH_READY_SELECTOR)
+    # 搜索页通过该接口获取结果，直接读取响应，不等待渲染；
+    # 读取失败时再按 SEARCH_NAVIGATION 等待页面渲染
+    SEARCH_API_PATH = "/cgi-bin/musicu.fcg"
+    SEARCH_API_MODULE = "music.search.SearchCgiService"
+    SEARCH_API_NAVIGATION = NavigationPolicy()
+    # get_song 中可以按需跳过的部分及各自的超时时间，单位为秒；各部分并发加载
+    SONG_SECTIONS = MappingProxyType({"lyrics": 10.0, "comments": 15.0})
+    SONG_NAVIGATION = NavigationPolicy(ready_selector=".mod_data")
+
+    manager: BrowserManager
+    api: QQMusicApi
+    login_checker: LoginChecker
+    client_mode: ClientMode
+    cache: ToolCache | None
+    catalog: SongCatalog | None
+    local_first: bool
+    flights: SingleFlight
+    scheduler: Scheduler | None
+
+    def __init__(
+        self,
+        manager: BrowserManager,
+        cache: ToolCache | None = None,
+        scheduler: Scheduler | None = None,
+        client_mode: ClientMode = "auto",
+        login_ttl: float = 300,
+        catalog: SongCatalog | None = None,
+        local_first: bool = False,
+    ):
+        self.manager = manager
+        self.login_checker = LoginChecker(
+            manager,
+            cookie_url=QQMusicApi.COOKIE_URL,
+            cookie_names=QQMusicApi.LOGIN_COOKIES,
+            probe=lambda: self.api.probe_login(),
+            ttl=login_ttl,
+        )
+        # 其他工具调用接口时发现未登录，下次检查登录状态时重新判断
+        self.api = QQMusicApi(manager, on_auth_error=self.login_checker.invalidate)
+        self.client_mode = client_mode
+        self.cache = cache
+        self.catalog = catalog
+        self.local_first = local_first
+        self.flights = SingleFlight()
+        self.scheduler = scheduler
+
+    async def __dispatch(
+        self,
+        api_call: Callable[[], Awaitable[Any]],
+        browser_call: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        if self.client_mode != "browser":
+            try:
+                return await api_call()
+            except Exception:
+                if self.client_mode == "api":
+                    raise
+                logger.warning(
+                    "API call failed, falling back to browser", exc_info=True
+                )
+        return await browser_call()
 
-    browser: Browser
-    context: BrowserContext
-
-    def __init__(self, browser: Browser, context: BrowserContext):
-        self.browser = browser
-        self.context = context
-
+    @metrics.instrument()
+    @coalesced()
     async def check_login(self) -> bool:
         """
         检查用户是否已登录。
 
+        根据登录 Cookie 和用户信息接口判断，结果会被缓存，不占用调度名额；
+        browser 模式或接口调用失败时打开首页检查。
+
         Returns:
             bool: 如果用户已登录返回 True，否则返回 False。
         """
         try:
-            page = await self.context.new_page()
-            await page.goto(QQMusic.BASE_URL, wait_until="networkidle")
-            if await self.__is_user_logged_in(page=page):
-                return True
+            return await self.__dispatch(
+                self.login_checker.check, self.__check_login_from_page
+            )
         except Exception:
             logger.exception("Error checking login status")
-        finally:
-            if page:
-                await page.close()
         return False
 
+    @scheduled(Priority.INTERACTIVE, name="check_login")
+    async def __check_login_from_page(self) -> bool:
+        async with self.manager.page() as page:
+            await navigate(page, self.BASE_URL, self.HOME_NAVIGATION)
+            return await self.__is_user_logged_in(page=page)
+
     async def __is_user_logged_in(self, page: Page) -> bool:
         login_btn = page.locator(".mod_header .top_login__link")
-        await login_btn.wait_for()
+        async with metrics.step("wait_login_btn"):
+            await login_btn.wait_for(timeout=self.HOME_NAVIGATION.step_timeout_ms)
+        # 页头先渲染未登录的按钮，登录状态水合后才会加上个人主页的 href，
+        # DOM 稳定不代表水合完成，因此等待 href 出现，超时视为未登录；
+        # 没有登录 Cookie 时一定未登录，直接返回，不等待
         try:
-            await wait_for_stable(page, login_btn)
-            profile_herf = await login_btn.get_attribute("href")
-            return profile_herf is not None
+            if not await self.__has_login_cookies(page=page):
+                return False
+            async with metrics.step("wait_login_href"):
+                await page.locator(".mod_header .top_login__link[href]").wait_for(
+                    state="attached", timeout=self.LOGIN_HREF_TIMEOUT_MS
+                )
+            return True
+        except PlaywrightTimeoutError:
+            return False
         except Exception:
             logger.exception("Error checking login status")
             return False
 
-    async def login(self, page: Page) -> None:
-        await page.goto(self.BASE_URL)
+    async def __has_login_cookies(self, page: Page) -> bool:
+        cookies = await page.context.cookies(QQMusicApi.COOKIE_URL)
+        names = {cookie.get("name") for cookie in cookies if cookie.get("value")}
+        return all(name in names for name in QQMusicApi.LOGIN_COOKIES)
 
-        login_btn = page.locator(".mod_header .top_login__link")
-        await login_btn.wait_for()
+    @metrics.instrument()
+    @scheduled(Priority.INTERACTIVE)
+    async def login(self) -> None:
+        # 登录需要展示头像和二维码，不拦截任何请求
+        try:
+            async with self.manager.page(route_policy=ALLOW_ALL) as page:
+                await self.__login(page=page)
+        finally:
+            self.login_checker.invalidate()
 
+    async def __login(self, page: Page) -> None:
+        await navigate(page, self.BASE_URL, self.HOME_NAVIGATION)
+
+        login_btn = page.locator(".mod_header .top_login__link")
         if await self.__is_user_logged_in(page=page):
             logger.info("Already logged in")
             return
@@ -108,114 +294,468 @@ class QQMusic:
         if not await self.__is_user_logged_in(page=page):
             raise Exception("登录失败")
 
-    async def search_songs(self, page: Page, keyword: str) -> list[Song]:
-        await page.goto(f"{self.BASE_URL}/n/ryqq/search?w={keyword}&t=song")
+    @metrics.instrument()
+    async def search_songs(self, keyword: str) -> list[Song]:
+        """
+        搜索歌曲，结果会写入本地目录
 
-        root = page.locator(".result")
-        loading = root.locator(".mod_loading")
-        await loading.wait_for()
-        await loading.wait_for(state="detached")
-
-        # 等待搜索结果加载
-        song_list_items = root.locator(".songlist__list").locator("> li")
-        song_list_items_count = await song_list_items.count()
-
-        results = []
-        for i in range(song_list_items_count):
-            song_item = song_list_items.nth(i)
-            name = await song_item.locator(".songlist__songname_txt a").get_attribute(
-                "title"
-            )
-            link = await song_item.locator(".songlist__songname_txt a").get_attribute(
-                "href"
+        开启 local_first 时先查本地目录，命中且全部未过期时直接返回，不占用调度名额；
+        未命中或有过期的歌曲时再从 QQ 音乐搜索。
+
+        Args:
+            keyword (str): 搜索关键词
+
+        Returns:
+            list[Song]: 歌曲列表
+        """
+        if self.local_first and self.catalog is not None:
+            songs = await self.catalog.lookup(keyword)
+            if songs is not None:
+                return songs
+        return await self.__search_songs_remote(keyword=keyword)
+
+    @metrics.instrument()
+    async def local_search_songs(self, keyword: str, limit: int = 20) -> list[Song]:
+        """
+        只在本地目录中搜索歌曲，不访问 QQ 音乐，不判断是否过期
+
+        Args:
+            keyword (str): 搜索关键词，空格分隔的每个词都需要出现在歌名、歌手或专辑中
+            limit (int): 最多返回的歌曲数
+
+        Returns:
+            list[Song]: 歌曲列表，没有本地目录时为空
+        """
+        if self.catalog is None:
+            return []
+        entries = await self.catalog.search(keyword, limit=limit)
+        return [entry.song for entry in entries]
+
+    @cached(ttl=600, stale_ttl=3600, name="search_songs")
+    @coalesced(name="search_songs")
+    @scheduled(name="search_songs")
+    async def __search_songs_remote(self, keyword: str) -> list[Song]:
+        songs = await self.__dispatch(
+            lambda: self.api.search_songs(keyword=keyword),
+            lambda: self.__search_songs_from_page(keyword=keyword),
+        )
+        await self.__add_to_catalog(songs)
+        return songs
+
+    async def __search_songs_from_page(self, keyword: str) -> list[Song]:
+        async with self.manager.page() as page:
+            return await self.__search_songs(page=page, keyword=keyword)
+
+    async def __search_songs(self, page: Page, keyword: str) -> list[Song]:
+        search_response = asyncio.get_running_loop().create_future()
+
+        def on_response(response: Response) -> None:
+            if not search_response.done() and self.__is_search_response(response):
+                search_response.set_result(response)
+
+        # 在导航前监听，避免错过响应；页面会被复用，结束后必须移除监听
+        page.on("response", on_response)
+        try:
+            await navigate(
+                page,
+                f"{self.BASE_URL}/n/ryqq/search?w={keyword}&t=song",
+                self.SEARCH_API_NAVIGATION,
             )
-            artist_elements = song_item.locator(".songlist__artist a")
-            artist_count = await artist_elements.count()
-            artists = []
-            for j in range(artist_count):
-                song_artist = await artist_elements.nth(j).get_attribute("title")
-                artists.append(song_artist)
-            album = None
-            if await has_element(song_item, ".songlist__album a"):
-                album = await song_item.locator(".songlist__album a").inner_text()
-            duration = await song_item.locator(".songlist__time").inner_text()
-            results.append(
-                Song(
-                    title=name,
-                    artists=artists,
-                    album=album,
-                    duration=duration,
-                    link=link,
+            try:
+                async with metrics.step("wait_search_api"):
+                    response = await asyncio.wait_for(
+                        search_response,
+                        self.SEARCH_API_NAVIGATION.ready_timeout_ms / 1000,
+                    )
+                    data = await response.json()
+                return songs_from_search_result(data)
+            except Exception:
+                logger.warning(
+                    "Failed to read search API response, falling back to DOM",
+                    exc_info=True,
                 )
+        finally:
+            page.remove_listener("response", on_response)
+        return await self.__search_songs_from_dom(page=page)
+
+    def __is_search_response(self, response: Response) -> bool:
+        if urlsplit(response.url).path != self.SEARCH_API_PATH:
+            return False
+        # 请求的模块名在 POST 正文或 GET 的 data 参数中
+        request = response.request
+        return self.SEARCH_API_MODULE in f"{request.url}{request.post_data or ''}"
+
+    async def __search_songs_from_dom(self, page: Page) -> list[Song]:
+        policy = self.SEARCH_NAVIGATION
+        root = page.locator(".result")
+        loading = root.locator(".mod_loading")
+        async with metrics.step("wait_mod_loading", round_trips=2):
+            await page.locator(self.SEARCH_READY_SELECTOR).first.wait_for(
+                timeout=policy.ready_timeout_ms
             )
-        return results
+            await loading.wait_for(state="detached", timeout=policy.step_timeout_ms)
 
-    async def get_song(self, page: Page, link: str) -> Song:
+        # 提取搜索结果
+        items = await extract_all(
+            root.locator(".songlist__list > li"), SONG_LIST_ITEM_FIELDS
+        )
+        return [Song.model_validate(item) for item in items]
+
+    @metrics.instrument()
+    @cached(ttl=3600, stale_ttl=86400, exclude=("timeout",))
+    # timeout 是每个调用方自己的截止时间，只有 timeout 相同的调用才能合并
+    @coalesced()
+    @scheduled()
+    async def get_song(
+        self,
+        link: str,
+        timeout: float | None = None,
+        include: tuple[str, ...] | None = None,
+    ) -> Song:
         """
-        获取歌曲详情
+        获取歌曲详情，加载基本信息后并发加载歌词和评论，每完成一部分报告一次进度
 
         Args:
-            page (Page): Playwright Page 对象
             link (str): 歌曲链接
+            timeout (float | None): 截止时间，单位为秒，超时后返回已经加载的部分
+            include (tuple[str, ...] | None): 需要加载的 SONG_SECTIONS，为 None 时全部加载，
+                未包含的部分不会抓取，值为 None
 
         Returns:
-            GetSongResult: 歌曲详情
+            Song: 歌曲详情
+
+        Raises:
+            PartialResult: 超时前已经加载了基本信息，或某一部分超过了自己的超时时间或加载失败，
+                未加载的歌词或评论为 None
+        """
+        return await self.__get_song(link=link, timeout=timeout, include=include)
+
+    @metrics.instrument()
+    async def get_songs(
+        self,
+        links: list[str],
+        concurrency: int = 4,
+        timeout: float | None = None,
+        include: tuple[str, ...] | None = None,
+    ) -> SongBatch:
         """
-        await page.goto(f"{self.BASE_URL}{link}")
+        批量获取歌曲详情，最多同时打开 concurrency 个页面，每完成一首报告一次进度
 
-        song_info_root = page.locator(".mod_data")
-        await song_info_root.wait_for()
-
-        # 提取歌名
-        title = await song_info_root.locator(".data__name_txt").get_attribute("title")
-        # 提取歌手
-        artist_elements = song_info_root.locator(".data__singer_txt")
-        artists = [
-            await artist_elements.nth(i).get_attribute("title")
-            for i in range(await artist_elements.count())
-        ]
-        # 提取专辑
-        album = await song_info_root.locator(".data_info__item_song a").get_attribute(
-            "title"
+        每首歌曲与 get_song 共用缓存，以 BULK 优先级调度，单首失败不影响其他歌曲。
+
+        Args:
+            links (list[str]): 歌曲链接
+            concurrency (int): 同时获取的歌曲数
+            timeout (float | None): 每首歌曲的截止时间，单位为秒
+            include (tuple[str, ...] | None): 需要加载的 SONG_SECTIONS，为 None 时全部加载
+
+        Returns:
+            SongBatch: 与 links 顺序一致的结果和总耗时
+        """
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        done = 0
+
+        async def one(link: str) -> SongBatchItem:
+            nonlocal done
+            async with semaphore:
+                start = time.perf_counter()
+                song, error = None, None
+                try:
+                    # 单首歌曲的进度不报告给调用方
+                    with progress_reporter(None):
+                        song = await self.__get_song_in_batch(
+                            link=link, timeout=timeout, include=include
+                        )
+                except PartialResult as e:
+                    song, error = e.result, "超时，仅包含部分内容"
+                except Exception as e:
+                    logger.warning(f"Get song {link} failed: {e!r}")
+                    error = str(e) or type(e).__name__
+                elapsed_ms = (time.perf_counter() - start) * 1000
+            done += 1
+            await report_progress(done, len(links))
+            return SongBatchItem(
+                link=link, song=song, error=error, elapsed_ms=elapsed_ms
+            )
+
+        start = time.perf_counter()
+        items = await asyncio.gather(*(one(link) for link in links))
+        failed = sum(item.error is not None for item in items)
+        return SongBatch(
+            items=items,
+            succeeded=len(items) - failed,
+            failed=failed,
+            elapsed_ms=(time.perf_counter() - start) * 1000,
         )
-        # 提取封面
-        cover = await song_info_root.locator(".data__cover .data__photo").get_attribute(
-            "src"
+
+    @metrics.instrument()
+    @cached(ttl=300, stale_ttl=1800)
+    @coalesced()
+    @scheduled()
+    async def get_song_comments(
+        self,
+        link: str,
+        group: str = "hot",
+        cursor: str | None = None,
+        page_size: int = 20,
+        comment_id: str | None = None,
+    ) -> CommentPage:
+        """
+        分页获取歌曲评论或某条评论的全部回复
+
+        页面只展示热门评论的第一页，因此总是通过评论接口获取，每页一次请求。
+
+        Args:
+            link (str): 歌曲链接
+            group (str): 评论组，hot 为热门评论，latest 为最新评论，replies 为回复
+            cursor (str | None): 上一页返回的 next_cursor，为 None 时获取第一页
+            page_size (int): 每页评论数
+            comment_id (str | None): group 为 replies 时回复的评论 id
+
+        Returns:
+            CommentPage: 一页评论和下一页的游标
+
+        Raises:
+            ValueError: 评论组未知、缺少 comment_id 或游标与请求不匹配
+        """
+        if group not in self.api.COMMENT_METHODS:
+            raise ValueError(
+                f"未知评论组: {group}，可选: {', '.join(self.api.COMMENT_METHODS)}"
+            )
+        if group == "replies" and not comment_id:
+            raise ValueError("获取回复需要 comment_id")
+        mid = song_mid(link)
+        state = {"mid": mid, "group": group, "comment_id": comment_id}
+        if cursor is not None:
+            previous = decode_cursor(cursor)
+            if any(previous.get(key) != value for key, value in state.items()):
+                raise ValueError("游标与请求的歌曲或评论组不匹配")
+            state = previous
+        else:
+            # 评论接口使用数字 id，记录在游标中，后续页不必再查询
+            _, state["song_id"] = await self.api.get_song_detail(mid)
+            state.update(page=0, seq="")
+
+        comment_list = await self.api.get_comments(
+            state["song_id"],
+            group,
+            page_num=state["page"],
+            page_size=page_size,
+            last_seq_no=state["seq"],
+            comment_id=comment_id,
+        )
+        next_cursor = None
+        if comment_list.has_more and comment_list.comments:
+            next_cursor = encode_cursor(
+                state | {"page": state["page"] + 1, "seq": comment_list.last_seq_no}
+            )
+        return CommentPage(
+            group=group,
+            comments=comment_list.comments,
+            total=comment_list.total,
+            next_cursor=next_cursor,
         )
-        if cover and cover.startswith("//"):
-            cover = f"https:{cover}"
 
-        detail_root = page.locator(".detail_layout")
-        loading = detail_root.locator(".mod_loading")
-        await loading.wait_for()
-        await loading.wait_for(state="detached")
+    @cached(ttl=3600, stale_ttl=86400, name="get_song", exclude=("timeout",))
+    @coalesced(name="get_song")
+    @scheduled(Priority.BULK, name="get_songs")
+    async def __get_song_in_batch(
+        self,
+        link: str,
+        timeout: float | None = None,
+        include: tuple[str, ...] | None = None,
+    ) -> Song:
+        return await self.__get_song(link=link, timeout=timeout, include=include)
+
+    async def __get_song(
+        self, link: str, timeout: float | None, include: tuple[str, ...] | None
+    ) -> Song:
+        sections = tuple(self.SONG_SECTIONS) if include is None else include
+        total = 1 + len(sections)
+        song = None
+        try:
+            async with asyncio.timeout(timeout):
+                done = 0
+                async for song in self.__load_song(link=link, sections=sections):
+                    done += 1
+                    if done == 1:
+                        # 目录只保存基本信息，不等待歌词和评论
+                        await self.__add_to_catalog(
+                            [
+                                song
+                                if song.link
+                                else song.model_copy(update={"link": link})
+                            ],
+                            detail=True,
+                        )
+                    await report_progress(done, total)
+        except TimeoutError:
+            # 截止时间前连基本信息都没有加载到，没有可以返回的部分结果
+            if song is None:
+                raise
+            raise PartialResult(song) from None
+        if song is None:
+            raise ValueError(f"没有获取到歌曲: {link}")
+        return song
+
+    async def __add_to_catalog(
+        self, songs: list[Song], *, detail: bool = False
+    ) -> None:
+        if self.catalog is not None:
+            await self.catalog.upsert(songs, detail=detail)
+
+    async def __load_song(
+        self, link: str, sections: tuple[str, ...]
+    ) -> AsyncGenerator[Song]:
+        # 每完成一部分产出一次同一个 Song 对象；已经产出过时不再回退，避免重复报告进度
+        if self.client_mode != "browser":
+            loaded = False
+            try:
+                async for song in self.__load_song_from_api(link, sections):
+                    loaded = True
+                    yield song
+                return
+            except Exception:
+                if self.client_mode == "api" or loaded:
+                    raise
+                logger.warning(
+                    "API call failed, falling back to browser", exc_info=True
+                )
+        async for song in self.__load_song_from_page(link, sections):
+            yield song
+
+    async def __load_song_from_api(
+        self, link: str, sections: tuple[str, ...]
+    ) -> AsyncGenerator[Song]:
+        mid = song_mid(link)
+        song, song_id = await self.api.get_song_detail(mid)
+        yield song
+        loaders = {
+            "lyrics": lambda: self.__get_lyrics(mid),
+            "comments": lambda: self.api.get_comment_groups(song_id),
+        }
+        async for _ in self.__load_sections(song, sections, loaders):
+            yield song
+
+    async def __load_song_from_page(
+        self, link: str, sections: tuple[str, ...]
+    ) -> AsyncGenerator[Song]:
+        async with self.manager.page() as page:
+            song = await self.__get_song_info(page=page, link=link)
+            yield song
+            if not sections:
+                return
+            await self.__wait_song_detail(page=page)
+            loaders = {
+                "lyrics": lambda: self.__get_lyrics_or_extract(page=page, link=link),
+                "comments": lambda: self.__extract_comment_groups(page=page),
+            }
+            async for _ in self.__load_sections(song, sections, loaders):
+                yield song
+
+    async def __load_sections(
+        self,
+        song: Song,
+        sections: tuple[str, ...],
+        loaders: dict[str, Callable[[], Awaitable[Any]]],
+    ) -> AsyncGenerator[Song]:
+        # 各部分互不依赖，并发加载，每完成一部分产出一次；
+        # 超时或出错的部分保持为 None，不影响其他部分，全部结束后以 PartialResult 返回
+        failed = []
+
+        async def load(name: str) -> tuple[str, Any]:
+            try:
+                async with asyncio.timeout(self.SONG_SECTIONS[name]):
+                    return name, await loaders[name]()
+            except TimeoutError:
+                logger.warning(f"Song section {name} timed out")
+            except Exception:
+                logger.warning(f"Failed to load song section {name}", exc_info=True)
+            failed.append(name)
+            return name, None
+
+        tasks = [asyncio.create_task(load(name)) for name in sections]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                name, value = await next_done
+                if name in failed:
+                    continue
+                setattr(song, name, value)
+                yield song
+        finally:
+            for task in tasks:
+                task.cancel()
+        if failed:
+            raise PartialResult(song)
+
+    async def __get_song_info(self, page: Page, link: str) -> Song:
+        await navigate(page, f"{self.BASE_URL}{link}", self.SONG_NAVIGATION)
 
-        lyrics = await self.__extract_lyrics(page=page)
-        comments = await self.__extract_comment_groups(page=page)
+        song_info_root = page.locator(".mod_data")
+        # 提取歌名、歌手、专辑和封面
+        song_info = await extract(song_info_root, SONG_INFO_FIELDS)
+        cover = song_info["cover"]
+        if cover and cover.startswith("//"):
+            cover = f"https:{cover}"
         return Song(
-            title=title,
-            artists=artists,
+            title=song_info["title"],
+            artists=song_info["artists"],
             cover=cover,
-            album=album,
-            lyrics=lyrics,
-            comments=comments,
+            album=song_info["album"],
         )
 
-    async def __extract_lyrics(self, page: Page) -> list[str]:
+    async def __wait_song_detail(self, page: Page) -> None:
+        timeout = self.SONG_NAVIGATION.step_timeout_ms
+        detail_root = page.locator(".detail_layout")
+        loading = detail_root.locator(".mod_loading")
+        async with metrics.step("wait_mod_loading", round_trips=2):
+            await detail_root.locator(".mod_loading, .mod_lyric").first.wait_for(
+                timeout=timeout
+            )
+            await loading.wait_for(state="detached", timeout=timeout)
+
+    async def __get_lyrics(self, mid: str) -> list[LyricLine]:
+        lyrics = await self.__fetch_lyrics(mid)
+        if not lyrics and self.cache is not None:
+            # 没有歌词也可能是接口暂时出错，空结果不永久缓存
+            await self.cache.invalidate("lyrics", {"mid": mid})
+        return lyrics
+
+    @cached(ttl=None, name="lyrics")
+    @coalesced(name="lyrics")
+    async def __fetch_lyrics(self, mid: str) -> list[LyricLine]:
+        # 歌词不会变化，按 mid 永久缓存，命中时不需要请求接口或打开页面
+        return await self.api.get_lyrics(mid)
+
+    async def __get_lyrics_or_extract(self, page: Page, link: str) -> list[LyricLine]:
+        try:
+            lyrics = await self.__get_lyrics(song_mid(link))
+        except Exception:
+            logger.warning(
+                "Failed to get lyrics from API, extracting from page", exc_info=True
+            )
+        else:
+            if lyrics:
+                return lyrics
+        return await self.__extract_lyrics(page=page)
+
+    async def __extract_lyrics(self, page: Page) -> list[LyricLine]:
+        # 页面默认只展示部分歌词且没有时间戳，只在歌词接口不可用时使用
         root = page.locator(".mod_lyric")
-        await root.wait_for()
-        # TODO 展开歌词
         # 定位歌词内容容器
         lyrics_container = root.locator("#lrc_content")
-        await lyrics_container.wait_for()
+        async with metrics.step("wait_lyrics"):
+            await lyrics_container.wait_for(
+                timeout=self.SONG_NAVIGATION.step_timeout_ms
+            )
         # 提取所有歌词行
-        lyrics_elements = lyrics_container.locator("p span")
-        lyrics_count = await lyrics_elements.count()
-        return [await lyrics_elements.nth(i).inner_text() for i in range(lyrics_count)]
+        result = await extract(lyrics_container, LYRICS_FIELDS)
+        return [LyricLine(time=None, text=line) for line in result["lines"]]
 
     async def __extract_comment_groups(self, page: Page) -> list[CommentGroup]:
         root = page.locator("#comment_box.mod_comment")
-        await root.wait_for()
+        async with metrics.step("wait_comment_box"):
+            await root.wait_for(timeout=self.SONG_NAVIGATION.step_timeout_ms)
 
         comment_groups = root.locator(".mod_hot_comment")
         hot_comment_group = await self.__extract_comment_group(comment_groups.first)
@@ -223,136 +763,22 @@ class QQMusic:
         return [hot_comment_group]
 
     async def __extract_comment_group(self, locator: Locator) -> CommentGroup:
-        group_name = await locator.locator(".comment_type__title").inner_text()
-
+        group = await extract(locator, COMMENT_GROUP_FIELDS)
         comments = []
-        comment_items = locator.locator("> ul.comment__list > li")
-        for i in range(await comment_items.count()):
-            item = comment_items.nth(i)
-
-            comment_info_element = item.locator("> div").first
-            # 提取用户名
-            username = await comment_info_element.locator(
-                ".comment__title > a"
-            ).inner_text()
-            # 提取日期和IP属地
-            date_and_location = await comment_info_element.locator(
-                ".comment__date"
-            ).inner_text()
-            # 提取评论内容
-            content = await comment_info_element.locator(
-                ".comment__text span"
-            ).inner_text()
-            # 提取点赞数
-            likes_text = await comment_info_element.locator(
-                ".comment__zan"
-            ).inner_text()
-            likes = int(likes_text) if likes_text.strip().isdigit() else 0
-
-            reply_count = 0
-            replies = []
-            if await has_element(item, ".comment__reply"):
-                comment_reply_element = item.locator(".comment__reply")
-                # 查看 x 条回复 btn
-                expand_btn = comment_reply_element.locator(".comment__reply_hd a")
-                # 提取评论回复数
-                expand_btn_text = await expand_btn.inner_text()
-                reply_count_text = (
-                    expand_btn_text.replace("查看", "").replace("条回复", "").strip()
-                    if "查看" in expand_btn_text
-                    else "0"
-                )
-                reply_count = int(reply_count_text) if reply_count_text.isdigit() else 0
-                # 提取评论回复列表
-                reply_list = comment_reply_element.locator("ul.comment__list")
-                # 判断是否展开
-                if await reply_list.count() > 1:
-                    replies = await self.__extract_expanded_comment_replies(reply_list)
-                else:
-                    replies = await self.__extract_unexpanded_comment_replies(
-                        reply_list
-                    )
+        for item in group["comments"]:
+            # 展开后回复列表不止一个
+            if item["reply_list_count"] > 1:
+                replies = item["expanded_replies"]
+            else:
+                replies = item["unexpanded_replies"]
             comments.append(
                 Comment(
-                    username=username,
-                    date_and_location=date_and_location,
-                    content=content,
-                    likes=likes,
-                    reply_count=reply_count,
-                    replies=replies,
+                    username=item["username"],
+                    date_and_location=item["date_and_location"],
+                    content=item["content"],
+                    likes=item["likes"] or 0,
+                    reply_count=item["reply_count"] or 0,
+                    replies=[CommentReply.model_validate(reply) for reply in replies],
                 )
             )
-        return CommentGroup(
-            name=group_name,
-            comments=comments,
-        )
-
-    async def __extract_unexpanded_comment_replies(
-        self, locator: Locator
-    ) -> list[CommentReply]:
-        """
-        提取未展开的评论回复列表
-
-        Args:
-            locator (Locator): .comment__reply ul.comment__list
-
-        Returns:
-            list[CommentReply]: 评论回复列表
-        """
-
-        replies = []
-        reply_items = locator.locator("> li")
-        for i in range(await reply_items.count()):
-            item = reply_items.nth(i)
-            # 提取用户名
-            username = await item.locator(".comment__text span a").inner_text()
-            # 提取评论内容
-            content = await item.locator(".comment__text span span").inner_text()
-            # 提取点赞数
-            likes_text = await item.locator(".comment__zan").inner_text()
-            likes = int(likes_text) if likes_text.strip().isdigit() else 0
-            # 创建 CommentReply 对象
-            reply = CommentReply(
-                username=username,
-                content=content,
-                likes=likes,
-            )
-            replies.append(reply)
-        return replies
-
-    async def __extract_expanded_comment_replies(
-        self, locator: Locator
-    ) -> list[CommentReply]:
-        """
-        提取展开的评论回复列表
-
-        Args:
-            locator (Locator): .comment__reply ul.comment__list
-
-        Returns:
-            list[CommentReply]: 评论回复列表
-        """
-        replies = []
-        reply_items = locator.locator("> li")
-        for i in range(await reply_items.count()):
-            item = reply_items.nth(i)
-            # 提取用户名
-            username = await item.locator(".comment__title > a").inner_text()
-            # 提取评论内容
-            content = await item.locator(".comment__text span").inner_text()
-            # 提取点赞数
-            likes_text = await item.locator(".comment__zan").inner_text()
-            likes = int(likes_text) if likes_text.strip().isdigit() else 0
-
-            # 创建 CommentReply 对象
-            reply = CommentReply(
-                username=username,
-                content=content,
-                likes=likes,
-            )
-            replies.append(reply)
-        return replies
-
-
-async def has_element(locator: Locator, selector: str) -> bool:
-    return await locator.locator(selector).count() > 0
+        return CommentGroup(name=group["name"], comments=comments)
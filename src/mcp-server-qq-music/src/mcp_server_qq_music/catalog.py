@@ -0,0 +1,270 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import Counter
+from collections.abc import Sequence
+from dataclasses import dataclass
+
+from .api import song_mid
+from .models import Song
+
+logger = logging.getLogger(__name__)
+
+# trigram 分词只能匹配不少于 3 个字符的词，更短的词改用 LIKE 查询
+TRIGRAM_MIN_CHARS = 3
+
+SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS songs (
+        id INTEGER PRIMARY KEY,
+        mid TEXT NOT NULL UNIQUE,
+        title TEXT NOT NULL,
+        artists TEXT NOT NULL,
+        album TEXT,
+        about TEXT,
+        link TEXT,
+        cover TEXT,
+        duration TEXT,
+        first_seen_at REAL NOT NULL,
+        updated_at REAL NOT NULL,
+        detail_updated_at REAL
+    )
+    """,
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS songs_fts USING fts5(
+        title, artists, album,
+        content='songs', content_rowid='id', tokenize='trigram'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS songs_ai AFTER INSERT ON songs BEGIN
+        INSERT INTO songs_fts (rowid, title, artists, album)
+        VALUES (new.id, new.title, new.artists, new.album);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS songs_ad AFTER DELETE ON songs BEGIN
+        INSERT INTO songs_fts (songs_fts, rowid, title, artists, album)
+        VALUES ('delete', old.id, old.title, old.artists, old.album);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS songs_au AFTER UPDATE ON songs BEGIN
+        INSERT INTO songs_fts (songs_fts, rowid, title, artists, album)
+        VALUES ('delete', old.id, old.title, old.artists, old.album);
+        INSERT INTO songs_fts (rowid, title, artists, album)
+        VALUES (new.id, new.title, new.artists, new.album);
+    END
+    """,
+)
+
+# 搜索结果不含简介，更新时保留歌曲详情中已有的字段
+UPSERT = """
+    INSERT INTO songs (
+        mid, title, artists, album, about, link, cover, duration,
+        first_seen_at, updated_at, detail_updated_at
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (mid) DO UPDATE SET
+        title = excluded.title,
+        artists = excluded.artists,
+        album = COALESCE(excluded.album, album),
+        about = COALESCE(excluded.about, about),
+        link = COALESCE(excluded.link, link),
+        cover = COALESCE(excluded.cover, cover),
+        duration = COALESCE(excluded.duration, duration),
+        updated_at = excluded.updated_at,
+        detail_updated_at = COALESCE(excluded.detail_updated_at, detail_updated_at)
+"""
+
+COLUMNS = (
+    "s.title, s.artists, s.album, s.about, s.link, s.cover, s.duration, s.updated_at"
+)
+
+
+@dataclass
+class CatalogEntry:
+    """本地目录中的一首歌曲"""
+
+    song: Song  # 歌曲基本信息，不包含歌词和评论
+    updated_at: float  # 最后一次从 QQ 音乐获取到这首歌曲的时间戳
+
+
+class SongCatalog:
+    """
+    本地歌曲目录，按歌曲 mid 保存见过的每一首歌曲，并对歌名、歌手和专辑建立全文索引
+
+    只保存基本信息，歌词和评论仍由工具缓存负责。数据库出错时只记录日志，不影响工具调用。
+
+    Args:
+        sqlite_path (str): SQLite 文件路径
+        max_age (float): 歌曲信息的有效期，单位为秒，超过后 lookup 视为过期
+    """
+
+    def __init__(self, sqlite_path: str, *, max_age: float = 86400):
+        self.sqlite_path = sqlite_path
+        self.max_age = max_age
+        # hit: 本地命中；stale: 命中但已过期；miss: 没有匹配的歌曲
+        self.lookups: Counter[str] = Counter()
+        self.upserts = 0
+
+        self._db: sqlite3.Connection | None = None
+        self._db_lock = threading.Lock()
+
+    async def upsert(self, songs: Sequence[Song], *, detail: bool = False) -> None:
+        """
+        写入或更新歌曲，没有链接的歌曲会被忽略
+
+        Args:
+            songs (Sequence[Song]): 歌曲列表
+            detail (bool): 是否来自歌曲详情，用于记录详情的更新时间
+        """
+        now = time.time()
+        rows = [
+            (
+                song_mid(song.link),
+                song.title,
+                json.dumps(song.artists, ensure_ascii=False),
+                song.album,
+                song.about,
+                song.link,
+                song.cover,
+                song.duration,
+                now,
+                now,
+                now if detail else None,
+            )
+            for song in songs
+            if song.link
+        ]
+        if not rows:
+            return
+        await self.__run(self.__upsert_sync, rows)
+
+    async def search(self, keyword: str, *, limit: int = 20) -> list[CatalogEntry]:
+        """
+        在本地目录中搜索歌曲，空格分隔的每个词都需要出现在歌名、歌手或专辑中
+
+        Args:
+            keyword (str): 搜索关键词
+            limit (int): 最多返回的歌曲数
+
+        Returns:
+            list[CatalogEntry]: 匹配的歌曲，全文索引命中时按相关度排序，否则按更新时间排序
+        """
+        terms = unicodedata.normalize("NFKC", keyword).split()
+        if not terms:
+            return []
+        return await self.__run(self.__search_sync, terms, limit) or []
+
+    async def lookup(self, keyword: str, *, limit: int = 20) -> list[Song] | None:
+        """
+        本地优先搜索时使用：命中且全部未过期时返回歌曲，否则返回 None
+
+        Args:
+            keyword (str): 搜索关键词
+            limit (int): 最多返回的歌曲数
+
+        Returns:
+            list[Song] | None: 本地目录中的歌曲，未命中或有过期的歌曲时为 None
+        """
+        entries = await self.search(keyword, limit=limit)
+        if not entries:
+            self.lookups["miss"] += 1
+            return None
+        deadline = time.time() - self.max_age
+        if any(entry.updated_at < deadline for entry in entries):
+            self.lookups["stale"] += 1
+            return None
+        self.lookups["hit"] += 1
+        return [entry.song for entry in entries]
+
+    async def close(self) -> None:
+        if self._db is not None:
+            await asyncio.to_thread(self._db.close)
+            self._db = None
+
+    def samples(self) -> list[tuple[str, dict[str, str], float]]:
+        return [
+            *(
+                ("catalog_lookups_total", {"result": result}, n)
+                for result, n in sorted(self.lookups.items())
+            ),
+            ("catalog_upserts_total", {}, self.upserts),
+        ]
+
+    async def __run(self, fn, *args):
+        try:
+            return await asyncio.to_thread(fn, *args)
+        except sqlite3.Error:
+            logger.exception("Catalog database error")
+            return None
+
+    def __upsert_sync(self, rows: list[tuple]) -> None:
+        with self._db_lock:
+            db = self.__get_db()
+            with db:
+                db.executemany(UPSERT, rows)
+            self.upserts += len(rows)
+
+    def __search_sync(self, terms: list[str], limit: int) -> list[CatalogEntry]:
+        if all(len(term) >= TRIGRAM_MIN_CHARS for term in terms):
+            # 每个词作为短语匹配，词之间为 AND
+            query = " ".join('"{}"'.format(term.replace('"', '""')) for term in terms)
+            sql = (
+                f"SELECT {COLUMNS} FROM songs_fts"
+                " JOIN songs s ON s.id = songs_fts.rowid"
+                " WHERE songs_fts MATCH ? ORDER BY songs_fts.rank LIMIT ?"
+            )
+            params = (query, limit)
+        else:
+            condition = "(s.title LIKE ? ESCAPE '\\' OR s.artists LIKE ? ESCAPE '\\'"
+            condition += " OR s.album LIKE ? ESCAPE '\\')"
+            sql = (
+                f"SELECT {COLUMNS} FROM songs s"
+                f" WHERE {' AND '.join([condition] * len(terms))}"
+                " ORDER BY s.updated_at DESC LIMIT ?"
+            )
+            params = (*(like for term in terms for like in [_like(term)] * 3), limit)
+        with self._db_lock:
+            rows = self.__get_db().execute(sql, params).fetchall()
+        return [
+            CatalogEntry(
+                song=Song(
+                    title=title,
+                    artists=json.loads(artists),
+                    album=album,
+                    about=about,
+                    link=link,
+                    cover=cover,
+                    duration=duration,
+                ),
+                updated_at=updated_at,
+            )
+            for title, artists, album, about, link, cover, duration, updated_at in rows
+        ]
+
+    def __get_db(self) -> sqlite3.Connection:
+        if self._db is None:
+            self._db = self.__connect()
+        return self._db
+
+    def __connect(self) -> sqlite3.Connection:
+        path = os.path.expanduser(self.sqlite_path)
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        db = sqlite3.connect(path, check_same_thread=False)
+        with db:
+            for statement in SCHEMA:
+                db.execute(statement)
+        return db
+
+
+def _like(term: str) -> str:
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
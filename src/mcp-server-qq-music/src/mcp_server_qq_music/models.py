@@ -0,0 +1,61 @@
+from pydantic import BaseModel
+
+
+class CommentGroup(BaseModel):
+    name: str  # 评论组名称
+    comments: list["Comment"]  # 评论列表
+
+
+class Comment(BaseModel):
+    username: str  # 用户名
+    date_and_location: str  # 评论日期和IP属地
+    content: str  # 评论内容
+    likes: int  # 点赞数
+    reply_count: int  # 回复数
+    replies: list["CommentReply"] | None  # 回复列表
+    id: str | None = None  # 评论 id，用于获取全部回复
+
+
+class CommentReply(BaseModel):
+    username: str  # 回复用户名
+    content: str  # 回复内容
+    likes: int  # 点赞数
+
+
+class LyricLine(BaseModel):
+    time: float | None  # 开始时间，单位为秒，没有时间戳时为 None
+    text: str  # 歌词
+    translation: str | None = None  # 翻译
+
+
+class Song(BaseModel):
+    title: str  # 歌名
+    about: str | None = None  # 简介
+    artists: list[str]  # 歌手
+    link: str | None = None  # 歌曲链接
+    cover: str | None = None  # 封面
+    album: str | None = None  # 专辑
+    duration: str | None = None  # 时长
+    lyrics: list[LyricLine] | None = None  # 歌词
+    comments: list[CommentGroup] | None = None  # 评论组列表
+
+
+class SongBatchItem(BaseModel):
+    link: str  # 歌曲链接
+    song: Song | None = None  # 歌曲详情，部分超时时只包含已经加载的部分
+    error: str | None = None  # 错误信息
+    elapsed_ms: float  # 耗时
+
+
+class SongBatch(BaseModel):
+    items: list[SongBatchItem]  # 与输入的链接顺序一致
+    succeeded: int  # 完整获取的歌曲数
+    failed: int  # 失败或只获取了部分内容的歌曲数
+    elapsed_ms: float  # 总耗时
+
+
+class CommentPage(BaseModel):
+    group: str  # 评论组
+    comments: list[Comment]  # 评论列表
+    total: int | None = None  # 评论总数
+    next_cursor: str | None = None  # 下一页的游标，没有更多评论时为 None
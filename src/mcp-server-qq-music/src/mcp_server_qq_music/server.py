@@ -1,13 +1,27 @@
+import json
 import logging
 from collections.abc import AsyncIterator
 from contextlib import asynccontextmanager
 from dataclasses import dataclass
 
 from fastmcp import Context, FastMCP
-from mcp_server_lib import browser_manager
+from mcp_server_lib import (
+    PartialResult,
+    QueueTimeoutError,
+    Scheduler,
+    ToolCache,
+    browser_manager,
+    dump,
+    metrics,
+    progress_reporter,
+    select_fields,
+    serve_prometheus,
+)
 from playwright.async_api import async_playwright
 
 from .browser import QQMusic
+from .catalog import SongCatalog
+from .models import Song
 from .settings import settings
 
 logging.basicConfig(
@@ -25,11 +39,86 @@ class AppContext:
 
 @asynccontextmanager
 async def app_lifespan(server: FastMCP) -> AsyncIterator[AppContext]:
+    cache = (
+        ToolCache(
+            max_entries=settings.cache_max_entries,
+            sqlite_path=settings.cache_path,
+        )
+        if settings.cache_enabled
+        else None
+    )
+    catalog = (
+        SongCatalog(settings.catalog_path, max_age=settings.catalog_max_age_seconds)
+        if settings.catalog_path
+        else None
+    )
+    metrics_server = (
+        await serve_prometheus(settings.metrics_host, settings.metrics_port)
+        if settings.metrics_port
+        else None
+    )
     async with async_playwright() as p:
         async with browser_manager(
-            playwright=p, storage_state_path=settings.storage_state_path
-        ) as (browser, context):
-            yield AppContext(qq=QQMusic(browser, context))
+            playwright=p,
+            storage_state_path=settings.storage_state_path,
+            pool_max_size=settings.page_pool_max_size,
+            pool_max_idle_seconds=settings.page_pool_max_idle_seconds,
+            pool_max_uses=settings.page_pool_max_uses,
+            route_policy=QQMusic.ROUTE_POLICY if settings.block_resources else None,
+            recycle_after_pages=settings.browser_recycle_after_pages,
+            recycle_rss_mb=settings.browser_recycle_rss_mb,
+            health_check_interval=settings.browser_health_check_interval,
+            network_mode=settings.network_mode,
+            har_path=settings.har_path,
+            cdp_endpoint=settings.cdp_endpoint,
+            cdp_autostart=settings.cdp_autostart,
+            lazy=settings.lazy_browser,
+            warm_up=settings.warm_up_browser,
+        ) as manager:
+            scheduler = Scheduler(
+                "qq_music",
+                max_concurrency=settings.max_concurrency,
+                rate=settings.rate_limit,
+                burst=settings.rate_limit_burst,
+                queue_timeout=settings.queue_timeout_seconds,
+            )
+            qq = QQMusic(
+                manager,
+                cache=cache,
+                scheduler=scheduler,
+                client_mode=settings.client_mode,
+                login_ttl=settings.login_check_ttl_seconds,
+                catalog=catalog,
+                local_first=settings.local_first_search,
+            )
+            collectors = [
+                manager.samples,
+                manager.route_stats.samples,
+                scheduler.samples,
+                qq.flights.samples,
+                qq.login_checker.samples,
+            ]
+            if cache:
+                collectors.append(cache.stats.samples)
+            if catalog:
+                collectors.append(catalog.samples)
+            for collector in collectors:
+                metrics.register(collector)
+            try:
+                yield AppContext(qq=qq)
+            finally:
+                # 全局的 metrics 在重新进入 lifespan 后仍然存在，不能继续引用已关闭的对象
+                for collector in collectors:
+                    metrics.unregister(collector)
+                if cache:
+                    await cache.close()
+                if catalog:
+                    await catalog.close()
+                if metrics_server:
+                    # 没有发完请求头的连接会让 wait_closed 一直等待，先关闭所有连接
+                    metrics_server.close()
+                    metrics_server.close_clients()
+                    await metrics_server.wait_closed()
 
 
 mcp = FastMCP(
@@ -43,6 +132,18 @@ def get_app_context(ctx: Context) -> AppContext:
     return ctx.request_context.lifespan_context
 
 
+@mcp.resource("metrics://tools", mime_type="application/json")
+def tool_metrics() -> str:
+    """工具调用指标，包括耗时直方图、错误数、页面步骤耗时和缓存命中数"""
+    return json.dumps(metrics.snapshot(), ensure_ascii=False)
+
+
+@mcp.resource("metrics://prometheus", mime_type="text/plain")
+def prometheus_metrics() -> str:
+    """Prometheus 文本格式的工具调用指标"""
+    return metrics.render_prometheus()
+
+
 @mcp.tool()
 async def check_login(ctx: Context) -> str:
     """检查登录状态
@@ -65,58 +166,241 @@ async def login(ctx: Context) -> str:
     """
     app_context = get_app_context(ctx)
     try:
-        page = await app_context.qq.context.new_page()
-        await app_context.qq.login(page=page)
+        await app_context.qq.login()
         return "登录成功"
+    except QueueTimeoutError:
+        return "请求过多，请稍后重试"
     except Exception:
         logger.exception("Login failed")
         return "登录失败"
-    finally:
-        if page:
-            await page.close()
 
 
 @mcp.tool()
-async def search_songs(ctx: Context, keyword: str) -> str:
+async def search_songs(
+    ctx: Context,
+    keyword: str,
+    fields: list[str] | None = None,
+    compact: bool = False,
+    max_chars: int | None = None,
+) -> str:
     """搜索歌曲，返回歌曲列表
 
     Args:
         keyword (str): 搜索关键词，如 "海阔天空"
+        fields (list[str] | None, optional): 只返回这些字段，如 ["title", "link"]. Defaults to None.
+        compact (bool, optional): 第一行为字段名，之后每行为一首歌曲的字段值. Defaults to False.
+        max_chars (int | None, optional): 结果的最大字符数，超出的歌曲被省略. Defaults to None.
 
     Returns:
         str: 歌曲列表，包括歌曲名称、歌手和链接
     """
     app_context = get_app_context(ctx)
     try:
-        page = await app_context.qq.context.new_page()
-        songs = await app_context.qq.search_songs(page=page, keyword=keyword)
-        return "\n".join([song.model_dump_json() for song in songs])
+        selected = select_fields(Song, fields)
+    except ValueError as e:
+        return str(e)
+    try:
+        songs = await app_context.qq.search_songs(keyword=keyword)
+        return dump(songs, fields=selected, compact=compact, max_chars=max_chars)
+    except QueueTimeoutError:
+        return "请求过多，请稍后重试"
     except Exception:
         logger.exception("Search songs failed")
         return "搜索歌曲失败"
-    finally:
-        if page:
-            await page.close()
 
 
 @mcp.tool()
-async def get_song(ctx: Context, link: str) -> str:
+async def local_search_songs(
+    ctx: Context,
+    keyword: str,
+    limit: int = 20,
+    fields: list[str] | None = None,
+    compact: bool = False,
+    max_chars: int | None = None,
+) -> str:
+    """在本地歌曲目录中搜索之前搜索或查看过的歌曲，不访问 QQ 音乐，毫秒级返回
+
+    Args:
+        keyword (str): 搜索关键词，空格分隔的每个词都需要出现在歌名、歌手或专辑中，如 "周杰伦 晴天"
+        limit (int, optional): 最多返回的歌曲数. Defaults to 20.
+        fields (list[str] | None, optional): 只返回这些字段，如 ["title", "link"]. Defaults to None.
+        compact (bool, optional): 第一行为字段名，之后每行为一首歌曲的字段值. Defaults to False.
+        max_chars (int | None, optional): 结果的最大字符数，超出的歌曲被省略. Defaults to None.
+
+    Returns:
+        str: 歌曲列表，没有匹配的歌曲时提示使用 search_songs
+    """
+    app_context = get_app_context(ctx)
+    try:
+        selected = select_fields(Song, fields)
+    except ValueError as e:
+        return str(e)
+    try:
+        songs = await app_context.qq.local_search_songs(
+            keyword=keyword, limit=max(1, min(limit, 100))
+        )
+    except Exception:
+        logger.exception("Local search songs failed")
+        return "搜索本地歌曲失败"
+    if not songs:
+        return "本地目录中没有匹配的歌曲，请使用 search_songs 搜索"
+    return dump(songs, fields=selected, compact=compact, max_chars=max_chars)
+
+
+def select_sections(
+    include: list[str] | None, fields: frozenset[str] | None
+) -> tuple[str, ...] | None:
+    """
+    确定 get_song 需要加载的部分，未指定 include 时按 fields 决定
+
+    Raises:
+        ValueError: include 中包含未知的部分
+    """
+    if include is not None:
+        unknown = sorted(set(include) - QQMusic.SONG_SECTIONS.keys())
+        if unknown:
+            raise ValueError(
+                f"未知部分: {', '.join(unknown)}，"
+                f"可选部分: {', '.join(QQMusic.SONG_SECTIONS)}"
+            )
+        return tuple(s for s in QQMusic.SONG_SECTIONS if s in include)
+    if fields is not None:
+        return tuple(s for s in QQMusic.SONG_SECTIONS if s in fields)
+    return None
+
+
+@mcp.tool()
+async def get_song(
+    ctx: Context,
+    link: str,
+    timeout_seconds: float | None = None,
+    include: list[str] | None = None,
+    fields: list[str] | None = None,
+    max_chars: int | None = None,
+) -> str:
     """输入歌曲链接，返回歌曲详情
 
     Args:
         link (str): 歌曲链接，如 "/n/ryqq/songDetail/002nHTx62ug8MZ"
+        timeout_seconds (float | None, optional): 最长等待时间，超时后返回已经加载的部分. Defaults to None.
+        include (list[str] | None, optional): 需要加载的部分，可选 "lyrics"、"comments"，为空列表时只返回基本信息，默认按 fields 决定. Defaults to None.
+        fields (list[str] | None, optional): 只返回这些字段，如 ["title", "lyrics"]，未请求的歌词和评论不会加载. Defaults to None.
+        max_chars (int | None, optional): 结果的最大字符数，超出时从最大的字段开始缩减，并标记 truncated. Defaults to None.
 
     Returns:
         str: 歌曲详情，包括歌曲名称、歌手、歌曲描述、歌词和评论
     """
     app_context = get_app_context(ctx)
     try:
-        page = await app_context.qq.context.new_page()
-        song = await app_context.qq.get_song(page=page, link=link)
-        return song.model_dump_json()
+        selected = select_fields(Song, fields)
+        sections = select_sections(include, selected)
+    except ValueError as e:
+        return str(e)
+    try:
+        with progress_reporter(ctx.report_progress):
+            song = await app_context.qq.get_song(
+                link=link, timeout=timeout_seconds, include=sections
+            )
+        return dump(song, fields=selected, max_chars=max_chars)
+    except PartialResult as e:
+        partial = dump(e.result, fields=selected, max_chars=max_chars)
+        return f"获取超时，仅返回部分结果\n{partial}"
+    except QueueTimeoutError:
+        return "请求过多，请稍后重试"
     except Exception:
         logger.exception("Get song failed")
         return "获取歌曲失败"
-    finally:
-        if page:
-            await page.close()
+
+
+@mcp.tool()
+async def get_songs(
+    ctx: Context,
+    links: list[str],
+    concurrency: int = 4,
+    timeout_seconds: float | None = None,
+    include: list[str] | None = None,
+    fields: list[str] | None = None,
+) -> str:
+    """批量获取歌曲详情，适合在搜索后获取多首歌曲，单首失败不影响其他歌曲
+
+    Args:
+        links (list[str]): 歌曲链接列表，如 ["/n/ryqq/songDetail/002nHTx62ug8MZ"]
+        concurrency (int, optional): 同时获取的歌曲数. Defaults to 4.
+        timeout_seconds (float | None, optional): 每首歌曲的最长等待时间. Defaults to None.
+        include (list[str] | None, optional): 需要加载的部分，可选 "lyrics"、"comments"，默认按 fields 决定. Defaults to None.
+        fields (list[str] | None, optional): 只返回这些字段，如 ["title", "lyrics"]. Defaults to None.
+
+    Returns:
+        str: 第一行为汇总，之后每行为一首歌曲的结果，顺序与 links 一致
+    """
+    app_context = get_app_context(ctx)
+    try:
+        selected = select_fields(Song, fields)
+        sections = select_sections(include, selected)
+    except ValueError as e:
+        return str(e)
+    try:
+        with progress_reporter(ctx.report_progress):
+            batch = await app_context.qq.get_songs(
+                links=links,
+                concurrency=concurrency,
+                timeout=timeout_seconds,
+                include=sections,
+            )
+    except Exception:
+        logger.exception("Get songs failed")
+        return "批量获取歌曲失败"
+    lines = [
+        (
+            f"共 {len(batch.items)} 首，成功 {batch.succeeded} 首，"
+            f"失败 {batch.failed} 首，耗时 {batch.elapsed_ms:.0f}ms"
+        )
+    ]
+    include_fields = {
+        "link": True,
+        "song": selected or True,
+        "error": True,
+        "elapsed_ms": True,
+    }
+    for item in batch.items:
+        lines.append(item.model_dump_json(include=include_fields, exclude_none=True))
+    return "\n".join(lines)
+
+
+@mcp.tool()
+async def get_song_comments(
+    ctx: Context,
+    link: str,
+    group: str = "hot",
+    cursor: str | None = None,
+    page_size: int = 20,
+    comment_id: str | None = None,
+) -> str:
+    """分页获取歌曲评论，或某条评论的全部回复
+
+    Args:
+        link (str): 歌曲链接，如 "/n/ryqq/songDetail/002nHTx62ug8MZ"
+        group (str, optional): 评论组，"hot" 为热门评论，"latest" 为最新评论，"replies" 为回复. Defaults to "hot".
+        cursor (str | None, optional): 上一页返回的 next_cursor，为空时获取第一页. Defaults to None.
+        page_size (int, optional): 每页评论数. Defaults to 20.
+        comment_id (str | None, optional): group 为 "replies" 时需要，评论的 id. Defaults to None.
+
+    Returns:
+        str: 一页评论，next_cursor 为空时表示没有更多评论
+    """
+    try:
+        page = await get_app_context(ctx).qq.get_song_comments(
+            link=link,
+            group=group,
+            cursor=cursor,
+            page_size=max(1, min(page_size, 50)),
+            comment_id=comment_id,
+        )
+        return page.model_dump_json(exclude_none=True)
+    except ValueError as e:
+        return str(e)
+    except QueueTimeoutError:
+        return "请求过多，请稍后重试"
+    except Exception:
+        logger.exception("Get song comments failed")
+        return "获取评论失败"
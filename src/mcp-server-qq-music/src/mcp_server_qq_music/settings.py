@@ -1,9 +1,44 @@
+from mcp_server_lib import NetworkMode
 from pydantic import Field
 from pydantic_settings import BaseSettings
 
+from .browser import ClientMode
+
 
 class Settings(BaseSettings):
     storage_state_path: str = Field(default="~/.mcp/qq-music/state.json")
+    # api: 只调用接口；browser: 只抓取页面；auto: 优先调用接口，失败时抓取页面
+    client_mode: ClientMode = Field(default="auto")
+    page_pool_max_size: int = Field(default=4)
+    page_pool_max_idle_seconds: float = Field(default=300)
+    page_pool_max_uses: int = Field(default=50)
+    block_resources: bool = Field(default=True)
+    lazy_browser: bool = Field(default=True)
+    warm_up_browser: bool = Field(default=True)
+    browser_recycle_after_pages: int | None = Field(default=500)
+    browser_recycle_rss_mb: float | None = Field(default=2048)
+    browser_health_check_interval: float = Field(default=30)
+    max_concurrency: int = Field(default=4)
+    rate_limit: float | None = Field(default=5)  # 每秒开始的调用数
+    rate_limit_burst: int = Field(default=5)
+    queue_timeout_seconds: float | None = Field(default=60)
+    # 共享浏览器的远程调试地址，如 http://127.0.0.1:9222
+    cdp_endpoint: str | None = Field(default=None)
+    cdp_autostart: bool = Field(default=True)
+    network_mode: NetworkMode = Field(default="live")
+    har_path: str = Field(default="~/.mcp/qq-music/session.har")
+    cache_enabled: bool = Field(default=True)
+    cache_max_entries: int = Field(default=256)
+    cache_path: str | None = Field(default="~/.mcp/qq-music/cache.sqlite3")
+    # 本地歌曲目录，为 None 时不保存
+    catalog_path: str | None = Field(default="~/.mcp/qq-music/catalog.sqlite3")
+    catalog_max_age_seconds: float = Field(default=86400)
+    # 搜索歌曲时先查本地目录，未命中或过期时再访问 QQ 音乐
+    local_first_search: bool = Field(default=False)
+    # 登录状态的缓存时间，不超过登录 Cookie 的过期时间
+    login_check_ttl_seconds: float = Field(default=300)
+    metrics_host: str = Field(default="127.0.0.1")
+    metrics_port: int | None = Field(default=None)
 
 
 settings = Settings()
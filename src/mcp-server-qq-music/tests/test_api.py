@@ -0,0 +1,37 @@
+import pytest
+from mcp_server_qq_music.api import decode_cursor, encode_cursor
+
+STATE = {
+    "mid": "002nHTx62ug8MZ",
+    "group": "hot",
+    "comment_id": None,
+    "song_id": 97773,
+    "page": 1,
+    "seq": "1700000000",
+}
+
+
+def test_decode_cursor_round_trip():
+    assert decode_cursor(encode_cursor(STATE)) == STATE
+
+
+@pytest.mark.parametrize(
+    "state",
+    [
+        {k: v for k, v in STATE.items() if k != "song_id"},
+        {k: v for k, v in STATE.items() if k != "page"},
+        {k: v for k, v in STATE.items() if k != "seq"},
+        STATE | {"page": "1"},
+        STATE | {"song_id": True},
+        STATE | {"seq": None},
+        ["not", "a", "dict"],
+    ],
+)
+def test_decode_cursor_rejects_incomplete_state(state):
+    with pytest.raises(ValueError, match="无效的游标"):
+        decode_cursor(encode_cursor(state))
+
+
+def test_decode_cursor_rejects_garbage():
+    with pytest.raises(ValueError, match="无效的游标"):
+        decode_cursor("not base64!")
@@ -0,0 +1,75 @@
+import asyncio
+from typing import cast
+
+import pytest
+from mcp_server_lib import BrowserManager, PartialResult, ToolCache
+from mcp_server_qq_music.api import QQMusicApi, QQMusicApiError
+from mcp_server_qq_music.browser import QQMusic
+from mcp_server_qq_music.models import CommentGroup, LyricLine, Song
+
+LINK = "/n/ryqq/songDetail/002nHTx62ug8MZ"
+# 测试只走接口模式，不会启动浏览器
+MANAGER = cast(BrowserManager, None)
+
+
+class StubApi(QQMusicApi):
+    """只实现 get_song 用到的接口，歌词接口总是失败"""
+
+    def __init__(self):
+        super().__init__(MANAGER)
+        self.lyric_calls = 0
+
+    async def get_song_detail(self, mid: str) -> tuple[Song, int]:
+        return Song(title="晴天", artists=["周杰伦"], link=LINK), 1
+
+    async def get_lyrics(self, mid: str) -> list[LyricLine]:
+        self.lyric_calls += 1
+        raise QQMusicApiError("get", "lyric", 500)
+
+    async def get_comment_groups(self, song_id: int) -> list[CommentGroup]:
+        return [CommentGroup(name="精彩评论", comments=[])]
+
+
+def test_get_song_returns_partial_result_when_a_section_fails():
+    qq = QQMusic(manager=MANAGER, client_mode="auto")
+    qq.api = StubApi()
+
+    async def main():
+        return await qq.get_song(LINK)
+
+    with pytest.raises(PartialResult) as exc_info:
+        asyncio.run(main())
+
+    song = exc_info.value.result
+    assert song.title == "晴天"
+    assert song.lyrics is None
+    assert song.comments == [CommentGroup(name="精彩评论", comments=[])]
+
+
+class LyricsApi(StubApi):
+    """第一次没有返回歌词，之后返回歌词"""
+
+    async def get_lyrics(self, mid: str) -> list[LyricLine]:
+        self.lyric_calls += 1
+        if self.lyric_calls == 1:
+            return []
+        return [LyricLine(time=0.0, text="故事的小黄花")]
+
+
+def test_empty_lyrics_are_not_cached():
+    cache = ToolCache()
+    qq = QQMusic(manager=MANAGER, cache=cache, client_mode="api")
+    qq.api = api = LyricsApi()
+
+    async def load_lyrics():
+        # 清空歌曲缓存，只保留歌词缓存
+        await cache.invalidate("get_song")
+        return (await qq.get_song(LINK, include=("lyrics",))).lyrics
+
+    async def main():
+        assert await load_lyrics() == []
+        assert await load_lyrics() == [LyricLine(time=0.0, text="故事的小黄花")]
+        assert await load_lyrics() == [LyricLine(time=0.0, text="故事的小黄花")]
+
+    asyncio.run(main())
+    assert api.lyric_calls == 2
@@ -1,11 +1,36 @@
+import asyncio
 import base64
 import logging
 import urllib.parse
 from collections.abc import AsyncGenerator
 from datetime import datetime
 
-from mcp_server_lib import wait_for_stable
-from playwright.async_api import Browser, BrowserContext, Page
+from mcp_server_lib import (
+    ALLOW_ALL,
+    Attr,
+    BrowserManager,
+    Count,
+    LoginChecker,
+    NavigationError,
+    NavigationPolicy,
+    PartialResult,
+    Priority,
+    RoutePolicy,
+    Scheduler,
+    SingleFlight,
+    Text,
+    ToolCache,
+    cached,
+    coalesced,
+    extract_all,
+    metrics,
+    navigate,
+    report_progress,
+    scheduled,
+    scroll_for_more,
+    wait_for_dom_stable,
+)
+from playwright.async_api import Page
 from pydantic import BaseModel
 
 logger = logging.getLogger(__name__)
@@ -22,6 +47,17 @@ class Note(BaseModel):
     date: datetime | None = None
 
 
+# 搜索结果中每个 section 的提取规则
+NOTE_SECTION_FIELDS = {
+    "index": Attr("data-index", transform="number"),
+    "link_count": Count(":scope > div a"),
+    "title": Text(".title span"),
+    "cover": Attr("src", ".cover img"),
+    "author": Text(".author .name"),
+    "likes": Text(".like-wrapper .count"),
+}
+
+
 class RedNoteError(Exception):
     """自定义异常类，用于处理小红书相关的错误"""
 
@@ -56,55 +92,114 @@ class RedNoteApiError(Exception):
 
 class RedNote:
     BASE_URL = "https://www.xiaohongshu.com"
+    # 当前登录用户信息，未登录时返回游客信息
+    USER_ME_URL = "https://edith.xiaohongshu.com/api/sns/web/v2/user/me"
+    # 登录后写入的 Cookie
+    LOGIN_COOKIES = ("web_session",)
+    # 登录已过期、未登录时 user/me 返回的错误码
+    AUTH_ERROR_CODES = frozenset({-100, -101})
+    # 抓取只读取封面的 src 属性，图片、视频和字体不需要真正加载
+    ROUTE_POLICY = RoutePolicy(
+        block_resource_types=frozenset({"image", "media", "font"}),
+        block_domains=frozenset(
+            {
+                "apm-fe.xiaohongshu.com",
+                "t2.xiaohongshu.com",
+            }
+        ),
+    )
+    # 各操作的导航策略：只等待需要读取的元素出现，不等待统计脚本等请求结束
+    LOGIN_NAVIGATION = NavigationPolicy(ready_selector=".qrcode .qrcode-img")
+    # 未登录时搜索结果页只展示登录弹窗
+    SEARCH_NAVIGATION = NavigationPolicy(
+        ready_selector=".search-layout .feeds-container",
+        error_selectors=(".login-container",),
+    )
 
-    browser: Browser
-    context: BrowserContext
+    manager: BrowserManager
+    login_checker: LoginChecker
+    cache: ToolCache | None
+    flights: SingleFlight
+    scheduler: Scheduler | None
 
-    def __init__(self, browser: Browser, context: BrowserContext):
-        self.browser = browser
-        self.context = context
+    def __init__(
+        self,
+        manager: BrowserManager,
+        cache: ToolCache | None = None,
+        scheduler: Scheduler | None = None,
+        login_ttl: float = 300,
+    ):
+        self.manager = manager
+        self.login_checker = LoginChecker(
+            manager,
+            cookie_url=self.BASE_URL,
+            cookie_names=self.LOGIN_COOKIES,
+            probe=self.__fetch_login_status,
+            ttl=login_ttl,
+        )
+        self.cache = cache
+        self.flights = SingleFlight()
+        self.scheduler = scheduler
 
+    @metrics.instrument(name="check_login")
+    @coalesced()
     async def is_user_logged_in(self) -> bool:
         """
         检查是否已登录小红书
 
+        根据登录 Cookie 和 user/me 接口判断，结果会被缓存，不占用调度名额。
+
         Returns:
             bool: 是否已登录
         """
         try:
-            resp = await self.context.request.get(
-                "https://edith.xiaohongshu.com/api/sns/web/v2/user/me"
-            )
-            if not resp.ok:
-                raise RedNoteApiError(
-                    method="get",
-                    url=resp.url,
-                    status_code=resp.status,
-                )
-            respBody = await resp.json()
-            code = respBody.get("code")
-            if code != 0:
-                raise RedNoteApiError(
-                    method="get",
-                    url=resp.url,
-                    status_code=resp.status,
-                    body=respBody,
-                )
-            if respBody.get("data", {}).get("guest", True):
-                return False
-            return True
+            return await self.login_checker.check()
         except Exception:
             logger.exception("check login failed")
             return False
 
-    async def login(self, page: Page) -> None:
+    async def __fetch_login_status(self) -> bool:
+        context = await self.manager.get_context()
+        async with metrics.step("api_user_me"):
+            resp = await context.request.get(self.USER_ME_URL)
+        if resp.status in (401, 403):
+            return False
+        if not resp.ok:
+            raise RedNoteApiError(
+                method="get",
+                url=resp.url,
+                status_code=resp.status,
+            )
+        respBody = await resp.json()
+        code = respBody.get("code")
+        if code in self.AUTH_ERROR_CODES:
+            return False
+        if code != 0:
+            raise RedNoteApiError(
+                method="get",
+                url=resp.url,
+                status_code=resp.status,
+                body=respBody,
+            )
+        if respBody.get("data", {}).get("guest", True):
+            return False
+        return True
+
+    @metrics.instrument()
+    @scheduled(Priority.INTERACTIVE)
+    async def login(self) -> None:
         """
         导航到 explore 页面、获取二维码并等待登录
-
-        Returns:
-            str: 用于登录的 Base64 格式的二维码图片。
         """
-        await page.goto(self.BASE_URL + "/explore")
+        # 登录需要展示二维码，不拦截任何请求
+        try:
+            async with self.manager.page(route_policy=ALLOW_ALL) as page:
+                await self.__login(page=page)
+        finally:
+            self.login_checker.invalidate()
+
+    async def __login(self, page: Page) -> None:
+        await navigate(page, self.BASE_URL + "/explore", self.LOGIN_NAVIGATION)
         qr_code_base64 = await self.__get_qr_code(page)
         # 等待扫码
         status_element = page.locator(".qrcode .status .status-text")
@@ -136,73 +231,97 @@ class RedNote:
             screenshot_buffer = await qrcode_element.screenshot()
             return base64.b64encode(screenshot_buffer).decode("utf-8")
 
+    @metrics.instrument()
+    @cached(ttl=300, stale_ttl=1800, exclude=("timeout",))
+    # timeout 是每个调用方自己的截止时间，只有 timeout 相同的调用才能合并
+    @coalesced()
+    @scheduled()
     async def search_notes(
-        self,
-        page: Page,
-        keyword: str,
-        limit: int = 10,
+        self, keyword: str, limit: int = 10, timeout: float | None = None
     ) -> list[Note]:
         """
-        搜索小红书笔记，获取笔记列表
+        搜索小红书笔记，获取笔记列表，每加载一篇笔记报告一次进度
 
         Args:
-            page (Page): Playwright 页面对象
-            params (SearchNotesParams): 搜索参数
+            keyword (str): 搜索关键词
+            limit (int): 返回笔记数量
+            timeout (float | None): 截止时间，单位为秒，超时后返回已经加载的笔记
 
         Returns:
-            list[SearchNotesResult]: 笔记列表
+            list[Note]: 笔记列表
+
+        Raises:
+            PartialResult: 超时前已经加载了部分笔记
         """
         encoded_keyword = urllib.parse.quote(keyword)
-        await page.goto(f"{self.BASE_URL}/search_result?keyword={encoded_keyword}")
         result = []
-        async for note in self.__load_notes(page, limit):
-            result.append(note)
+        try:
+            async with asyncio.timeout(timeout):
+                async with self.manager.page() as page:
+                    try:
+                        await navigate(
+                            page,
+                            f"{self.BASE_URL}/search_result?keyword={encoded_keyword}",
+                            self.SEARCH_NAVIGATION,
+                        )
+                    except NavigationError:
+                        # 登录弹窗或错误状态码可能意味着会话已失效，下次检查时重新判断
+                        self.login_checker.invalidate()
+                        raise
+                    async for note in self.__load_notes(page, limit):
+                        result.append(note)
+                        await report_progress(len(result), limit)
+        except TimeoutError:
+            if not result:
+                raise
+            raise PartialResult(result) from None
         return result
 
     async def __load_notes(self, page: Page, limit: int) -> AsyncGenerator[Note]:
-        data_idx_set = set()
+        feeds_container = page.locator(".search-layout .feeds-container")
+        async with metrics.step("wait_feeds_container"):
+            await feeds_container.wait_for(
+                state="visible", timeout=self.SEARCH_NAVIGATION.step_timeout_ms
+            )
+        feeds = feeds_container.locator("> section")
+        # 等待首屏内容稳定
+        await wait_for_dom_stable(feeds_container)
 
+        # 列表是虚拟滚动的，已经处理过的 section 可能被移除，按 data-index 增量提取
+        max_index = -1
+        count = 0
         while True:
-            feeds_container = page.locator(".search-layout .feeds-container")
-            await feeds_container.wait_for(state="visible", timeout=10000)
-            feeds = feeds_container.locator("> section")
-            # 等待内容稳定
-            await wait_for_stable(page=page, locator=feeds.first)
-            feeds_count = await feeds.count()
-            for i in range(feeds_count):
-                section = feeds.nth(i)
-
+            items = await extract_all(
+                feeds, NOTE_SECTION_FIELDS, after=("data-index", max_index)
+            )
+            items = [item for item in items if item["index"] is not None]
+            for item in sorted(items, key=lambda item: item["index"]):
+                max_index = max(max_index, item["index"])
                 # 判断 section 下是否有 a 元素，没有则跳过
-                count_a = await section.locator("> div a").count()
-                if count_a == 0:
+                if item["link_count"] == 0:
                     logger.info("非笔记 section，跳过")
                     continue
 
-                data_idx = await section.get_attribute("data-index")
-                data_idx = int(data_idx)
-                if data_idx in data_idx_set:
-                    logger.info(f"笔记 {data_idx} 已存在，跳过该笔记")
-                    continue
-                data_idx_set.add(data_idx)
-                if len(data_idx_set) >= limit:
-                    break
-
-                title_element = section.locator(".title span")
-                title = await title_element.inner_text()
-                cover_element = section.locator(".cover img")
-                cover = await cover_element.get_attribute("src")
-                author_element = section.locator(".author .name")
-                author = await author_element.inner_text()
-                likes_element = section.locator(".like-wrapper .count")
-                likes = await likes_element.inner_text()
-                logger.info(f"笔记 {data_idx}：{title}, 作者 {author}，点赞数 {likes}")
+                title, author, likes = item["title"], item["author"], item["likes"]
+                logger.info(
+                    f"笔记 {item['index']}：{title}, 作者 {author}，点赞数 {likes}"
+                )
                 yield Note(
                     title=title,
-                    cover=cover,
+                    cover=item["cover"],
                     author=author,
                     likes=likes,
                 )
-            if len(data_idx_set) >= limit:
-                break
-            # 滚动页面以加载更多笔记
-            await page.evaluate("window.scrollBy(0, 1000);")
+                count += 1
+                if count >= limit:
+                    return
+            # 把最后一个 section 滚动到可见区域，等待加载出新的 section
+            if not await scroll_for_more(
+                feeds_container,
+                ":scope > section",
+                "data-index",
+                max_index,
+                timeout_ms=self.SEARCH_NAVIGATION.step_timeout_ms,
+            ):
+                logger.info(f"没有更多笔记，共 {count} 篇")
+                return
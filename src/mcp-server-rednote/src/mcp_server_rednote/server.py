@@ -1,13 +1,25 @@
+import json
 import logging
 from collections.abc import AsyncIterator
 from contextlib import asynccontextmanager
 from dataclasses import dataclass
 
 from fastmcp import Context, FastMCP
-from mcp_server_lib import browser_manager
+from mcp_server_lib import (
+    PartialResult,
+    QueueTimeoutError,
+    Scheduler,
+    ToolCache,
+    browser_manager,
+    dump,
+    metrics,
+    progress_reporter,
+    select_fields,
+    serve_prometheus,
+)
 from playwright.async_api import async_playwright
 
-from .browser import RedNote
+from .browser import Note, RedNote
 from .settings import settings
 
 logging.basicConfig(
@@ -25,11 +37,74 @@ class AppContext:
 
 @asynccontextmanager
 async def app_lifespan(server: FastMCP) -> AsyncIterator[AppContext]:
+    cache = (
+        ToolCache(
+            max_entries=settings.cache_max_entries,
+            sqlite_path=settings.cache_path,
+        )
+        if settings.cache_enabled
+        else None
+    )
+    metrics_server = (
+        await serve_prometheus(settings.metrics_host, settings.metrics_port)
+        if settings.metrics_port
+        else None
+    )
     async with async_playwright() as p:
         async with browser_manager(
-            playwright=p, storage_state_path=settings.storage_state_path
-        ) as (browser, context):
-            yield AppContext(rednote=RedNote(browser, context))
+            playwright=p,
+            storage_state_path=settings.storage_state_path,
+            pool_max_size=settings.page_pool_max_size,
+            pool_max_idle_seconds=settings.page_pool_max_idle_seconds,
+            pool_max_uses=settings.page_pool_max_uses,
+            route_policy=RedNote.ROUTE_POLICY if settings.block_resources else None,
+            recycle_after_pages=settings.browser_recycle_after_pages,
+            recycle_rss_mb=settings.browser_recycle_rss_mb,
+            health_check_interval=settings.browser_health_check_interval,
+            network_mode=settings.network_mode,
+            har_path=settings.har_path,
+            cdp_endpoint=settings.cdp_endpoint,
+            cdp_autostart=settings.cdp_autostart,
+            lazy=settings.lazy_browser,
+            warm_up=settings.warm_up_browser,
+        ) as manager:
+            scheduler = Scheduler(
+                "rednote",
+                max_concurrency=settings.max_concurrency,
+                rate=settings.rate_limit,
+                burst=settings.rate_limit_burst,
+                queue_timeout=settings.queue_timeout_seconds,
+            )
+            rednote = RedNote(
+                manager,
+                cache=cache,
+                scheduler=scheduler,
+                login_ttl=settings.login_check_ttl_seconds,
+            )
+            collectors = [
+                manager.samples,
+                manager.route_stats.samples,
+                scheduler.samples,
+                rednote.flights.samples,
+                rednote.login_checker.samples,
+            ]
+            if cache:
+                collectors.append(cache.stats.samples)
+            for collector in collectors:
+                metrics.register(collector)
+            try:
+                yield AppContext(rednote=rednote)
+            finally:
+                # 全局的 metrics 在重新进入 lifespan 后仍然存在，不能继续引用已关闭的对象
+                for collector in collectors:
+                    metrics.unregister(collector)
+                if cache:
+                    await cache.close()
+                if metrics_server:
+                    # 没有发完请求头的连接会让 wait_closed 一直等待，先关闭所有连接
+                    metrics_server.close()
+                    metrics_server.close_clients()
+                    await metrics_server.wait_closed()
 
 
 mcp = FastMCP(
@@ -42,6 +117,18 @@ def get_app_context(ctx: Context) -> AppContext:
     return ctx.request_context.lifespan_context
 
 
+@mcp.resource("metrics://tools", mime_type="application/json")
+def tool_metrics() -> str:
+    """工具调用指标，包括耗时直方图、错误数、页面步骤耗时和缓存命中数"""
+    return json.dumps(metrics.snapshot(), ensure_ascii=False)
+
+
+@mcp.resource("metrics://prometheus", mime_type="text/plain")
+def prometheus_metrics() -> str:
+    """Prometheus 文本格式的工具调用指标"""
+    return metrics.render_prometheus()
+
+
 @mcp.tool()
 async def check_login(ctx: Context) -> str:
     """检查登录状态
@@ -63,37 +150,53 @@ async def login(ctx: Context) -> str:
         str: 操作结果
     """
     try:
-        page = await get_app_context(ctx).rednote.context.new_page()
-        await get_app_context(ctx).rednote.login(page=page)
+        await get_app_context(ctx).rednote.login()
         return "登录成功"
+    except QueueTimeoutError:
+        return "请求过多，请稍后重试"
     except Exception:
         logger.exception("Login failed")
         return "登录失败"
-    finally:
-        if page:
-            await page.close()
 
 
 @mcp.tool()
-async def search_notes(ctx: Context, keyword: str, limit: int = 10) -> str:
+async def search_notes(
+    ctx: Context,
+    keyword: str,
+    limit: int = 10,
+    timeout_seconds: float | None = None,
+    fields: list[str] | None = None,
+    compact: bool = False,
+    max_chars: int | None = None,
+) -> str:
     """搜索小红书笔记
 
     Args:
         keyword (str): 搜索关键词
         limit (int, optional): 返回笔记数量. Defaults to 10.
+        timeout_seconds (float | None, optional): 最长等待时间，超时后返回已经加载的笔记. Defaults to None.
+        fields (list[str] | None, optional): 只返回这些字段，如 ["title", "likes"]. Defaults to None.
+        compact (bool, optional): 第一行为字段名，之后每行为一篇笔记的字段值. Defaults to False.
+        max_chars (int | None, optional): 结果的最大字符数，超出的笔记被省略. Defaults to None.
 
     Returns:
         str: 笔记列表
     """
     try:
-        page = await get_app_context(ctx).rednote.context.new_page()
-        notes = await get_app_context(ctx).rednote.search_notes(
-            page=page, keyword=keyword, limit=limit
-        )
-        return "\n".join([note.model_dump_json() for note in notes])
+        selected = select_fields(Note, fields)
+    except ValueError as e:
+        return str(e)
+    try:
+        with progress_reporter(ctx.report_progress):
+            notes = await get_app_context(ctx).rednote.search_notes(
+                keyword=keyword, limit=limit, timeout=timeout_seconds
+            )
+        return dump(notes, fields=selected, compact=compact, max_chars=max_chars)
+    except PartialResult as e:
+        partial = dump(e.result, fields=selected, compact=compact, max_chars=max_chars)
+        return f"搜索超时，仅返回部分结果\n{partial}"
+    except QueueTimeoutError:
+        return "请求过多，请稍后重试"
     except Exception:
         logger.exception("Search notes failed")
         return "搜索笔记失败"
-    finally:
-        if page:
-            await page.close()
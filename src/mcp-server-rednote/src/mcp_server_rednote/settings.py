@@ -1,9 +1,35 @@
+from mcp_server_lib import NetworkMode
 from pydantic import Field
 from pydantic_settings import BaseSettings
 
 
 class Settings(BaseSettings):
     storage_state_path: str = Field(default="~/.mcp/rednote/state.json")
+    page_pool_max_size: int = Field(default=4)
+    page_pool_max_idle_seconds: float = Field(default=300)
+    page_pool_max_uses: int = Field(default=50)
+    block_resources: bool = Field(default=True)
+    lazy_browser: bool = Field(default=True)
+    warm_up_browser: bool = Field(default=True)
+    browser_recycle_after_pages: int | None = Field(default=500)
+    browser_recycle_rss_mb: float | None = Field(default=2048)
+    browser_health_check_interval: float = Field(default=30)
+    max_concurrency: int = Field(default=4)
+    rate_limit: float | None = Field(default=0.5)  # 每秒开始的调用数
+    rate_limit_burst: int = Field(default=3)
+    queue_timeout_seconds: float | None = Field(default=60)
+    # 共享浏览器的远程调试地址，如 http://127.0.0.1:9222
+    cdp_endpoint: str | None = Field(default=None)
+    cdp_autostart: bool = Field(default=True)
+    network_mode: NetworkMode = Field(default="live")
+    har_path: str = Field(default="~/.mcp/rednote/session.har")
+    cache_enabled: bool = Field(default=True)
+    cache_max_entries: int = Field(default=256)
+    cache_path: str | None = Field(default="~/.mcp/rednote/cache.sqlite3")
+    # 登录状态的缓存时间，不超过登录 Cookie 的过期时间
+    login_check_ttl_seconds: float = Field(default=300)
+    metrics_host: str = Field(default="127.0.0.1")
+    metrics_port: int | None = Field(default=None)
 
 
 settings = Settings()